@@ -10,6 +10,7 @@ import re
 import time
 import os
 import sys
+import threading
 from datetime import datetime
 import logging
 
@@ -42,13 +43,50 @@ logging.basicConfig(
     ]
 )
 
+# Console status prefixes. Emoji are opt-in (PY_EMOJI=1) because non-UTF-8
+# stdouts (CI logs, Windows cmd) fall back to slow per-character replacement
+EMOJI = os.environ.get('PY_EMOJI', '0') == '1'
+_AI = '🤖' if EMOJI else '[AI]'
+_OK = '✅' if EMOJI else '[OK]'
+_FAIL = '❌' if EMOJI else '[FAIL]'
+_ERROR = '💥' if EMOJI else '[ERROR]'
+_WARN = '⚠️' if EMOJI else '[WARN]'
+_SEARCH = '🔍' if EMOJI else '[SEARCH]'
+_INFO = '📋' if EMOJI else '[INFO]'
+_DONE = '🎉' if EMOJI else '[DONE]'
+_START = '🚀' if EMOJI else '[START]'
+_TARGET = '🎯' if EMOJI else '[TARGET]'
+_CITY = '🏙️' if EMOJI else '[CITY]'
+_STATS = '📊' if EMOJI else '[STATS]'
+_RESTART = '🔄' if EMOJI else '[RESTART]'
+_NEW = '➕' if EMOJI else '[NEW]'
+_SAVE = '💾' if EMOJI else '[SAVE]'
+_RUN = '🔧' if EMOJI else '[RUN]'
+_WAIT = '⏳' if EMOJI else '[WAIT]'
+_SEP = "=" * 60
+
+# Gemini requests-per-minute quota used to pace enrichment calls
+GEMINI_REQUESTS_PER_MINUTE = 30
+
 
 class DatabaseManager:
     """Handles all database operations for the agency finder"""
 
+    # Contact fields filled in by web search enrichment (bit order for _update_stmts)
+    ENRICHABLE_FIELDS = ('website', 'phone', 'address')
+
     def __init__(self, db_path='agencies.db'):
         self.db_path = db_path
 
+        # Precompute one UPDATE statement per subset of enrichable fields so the
+        # SQL text is stable and sqlite's statement cache can reuse the plan
+        self._update_stmts = {}
+        for bitmask in range(1, 1 << len(self.ENRICHABLE_FIELDS)):
+            set_parts = [f"{field} = ?" for bit, field in enumerate(self.ENRICHABLE_FIELDS) if bitmask & (1 << bit)]
+            self._update_stmts[bitmask] = (
+                f"UPDATE agencies SET {', '.join(set_parts)}, additional_info = additional_info || ? WHERE id = ?"
+            )
+
     def get_connection(self):
         """Get database connection"""
         return sqlite3.connect(self.db_path)
@@ -70,7 +108,7 @@ class DatabaseManager:
             conn.close()
             return domains
         except Exception as e:
-            logging.error(f"Error getting existing domains: {e}")
+            logging.error("Error getting existing domains: %s", e)
             return set()
 
     def get_existing_names(self):
@@ -87,7 +125,7 @@ class DatabaseManager:
             conn.close()
             return names
         except Exception as e:
-            logging.error(f"Error getting existing names: {e}")
+            logging.error("Error getting existing names: %s", e)
             return set()
 
     def save_agencies(self, agencies):
@@ -115,14 +153,14 @@ class DatabaseManager:
                     agency.get('polish_city', '')
                 ))
                 saved_count += 1
-                logging.info(f"Added new agency: {agency['name']}")
+                logging.info("Added new agency: %s", agency['name'])
 
             conn.commit()
             conn.close()
             return saved_count
 
         except Exception as e:
-            logging.error(f"Error saving agencies: {e}")
+            logging.error("Error saving agencies: %s", e)
             return 0
 
     def get_existing_agencies_by_city(self):
@@ -155,7 +193,7 @@ class DatabaseManager:
             return agencies_by_city
 
         except Exception as e:
-            logging.error(f"Error getting existing agencies by city: {e}")
+            logging.error("Error getting existing agencies by city: %s", e)
             return {}
 
     def extract_city_from_text(self, text):
@@ -179,17 +217,31 @@ class DatabaseManager:
 
         return None
 
+    def ensure_search_tracking_columns(self, cursor):
+        """Add the web search negative-cache columns if the database predates them"""
+        cursor.execute('PRAGMA table_info(agencies)')
+        columns = {row[1] for row in cursor.fetchall()}
+        if 'last_search_ts' not in columns:
+            cursor.execute('ALTER TABLE agencies ADD COLUMN last_search_ts INTEGER')
+        if 'last_search_miss' not in columns:
+            cursor.execute('ALTER TABLE agencies ADD COLUMN last_search_miss INTEGER DEFAULT 0')
+
     def get_agencies_with_missing_data(self, agency_type='gemini_discovered'):
         """Get agencies with missing contact information"""
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
+            self.ensure_search_tracking_columns(cursor)
 
+            # Skip agencies whose last search came back empty, backing off
+            # exponentially (1, 2, 4, ... 32 days) with each consecutive miss
             cursor.execute('''
                 SELECT id, name, website, phone, address, description
                 FROM agencies
                 WHERE type = ?
                 AND (website IS NULL OR website = '' OR phone IS NULL OR phone = '' OR address IS NULL OR address = '')
+                AND (last_search_ts IS NULL
+                     OR last_search_ts < strftime('%s', 'now') - 86400 * (1 << min(COALESCE(last_search_miss, 1) - 1, 5)))
                 ORDER BY id
             ''', (agency_type,))
 
@@ -198,7 +250,7 @@ class DatabaseManager:
             return agencies
 
         except Exception as e:
-            logging.error(f"Error getting agencies with missing data: {e}")
+            logging.error("Error getting agencies with missing data: %s", e)
             return []
 
     def update_agency_data(self, agency_id, updates):
@@ -207,37 +259,50 @@ class DatabaseManager:
             conn = self.get_connection()
             cursor = conn.cursor()
 
-            # Build update query dynamically
-            set_parts = []
+            # Pick the precompiled statement matching the fields that were found
+            bitmask = 0
             values = []
-            for field, value in updates.items():
+            for bit, field in enumerate(self.ENRICHABLE_FIELDS):
+                value = updates.get(field)
                 if value and value != 'Not found':
-                    set_parts.append(f"{field} = ?")
+                    bitmask |= 1 << bit
                     values.append(value)
 
-            if set_parts:
-                query = f"UPDATE agencies SET {', '.join(set_parts)} WHERE id = ?"
+            if bitmask:
+                # Note the data enrichment in additional_info within the same statement
+                values.append(f" | Data enriched via web search on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} (added: {', '.join(updates.keys())})")
                 values.append(agency_id)
 
-                cursor.execute(query, values)
+                cursor.execute(self._update_stmts[bitmask], values)
                 conn.commit()
 
-                # Update additional_info to note the data enrichment
-                cursor.execute('''
-                    UPDATE agencies
-                    SET additional_info = additional_info || ?
-                    WHERE id = ?
-                ''', (
-                    f" | Data enriched via web search on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} (added: {', '.join(updates.keys())})",
-                    agency_id
-                ))
-                conn.commit()
+            conn.close()
+            return True
+
+        except Exception as e:
+            logging.error("Error updating agency data: %s", e)
+            return False
 
+    def record_search_miss(self, agency_id):
+        """Remember that a web search found nothing so the agency is skipped for a while"""
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            self.ensure_search_tracking_columns(cursor)
+
+            cursor.execute('''
+                UPDATE agencies
+                SET last_search_ts = CAST(strftime('%s', 'now') AS INTEGER),
+                    last_search_miss = COALESCE(last_search_miss, 0) + 1
+                WHERE id = ?
+            ''', (agency_id,))
+
+            conn.commit()
             conn.close()
             return True
 
         except Exception as e:
-            logging.error(f"Error updating agency data: {e}")
+            logging.error("Error recording search miss: %s", e)
             return False
 
     def get_agencies_needing_description_updates(self, agency_type='gemini_discovered', target_cities=None):
@@ -268,7 +333,7 @@ class DatabaseManager:
             return agencies
 
         except Exception as e:
-            logging.error(f"Error getting agencies needing description updates: {e}")
+            logging.error("Error getting agencies needing description updates: %s", e)
             return []
 
     def update_agency_description(self, agency_id, new_description):
@@ -292,7 +357,7 @@ class DatabaseManager:
             return True
 
         except Exception as e:
-            logging.error(f"Error updating agency description: {e}")
+            logging.error("Error updating agency description: %s", e)
             return False
 
 
@@ -308,8 +373,8 @@ class GeminiClient:
     def run_gemini_prompt(self, prompt, use_web_search=False):
         """Run a prompt through Google Gen AI library"""
         try:
-            print(f"🤖 Querying Gemini AI... ({len(prompt)} chars)")
-            logging.info(f"Running Gemini prompt: {prompt[:100]}...")
+            print(f"{_AI} Querying Gemini AI... ({len(prompt)} chars)")
+            logging.info("Running Gemini prompt: %s...", prompt[:100])
 
             # Configure tools for web search if requested
             config = None
@@ -328,16 +393,16 @@ class GeminiClient:
 
             if response and response.text:
                 response_length = len(response.text.strip())
-                print(f"✅ Gemini response received ({response_length} chars)")
+                print(f"{_OK} Gemini response received ({response_length} chars)")
                 return response.text.strip()
             else:
-                print("❌ No response from Gemini API")
+                print(f"{_FAIL} No response from Gemini API")
                 logging.error("No response from Gemini API")
                 return None
 
         except Exception as e:
-            print(f"💥 Error running Gemini: {str(e)[:100]}...")
-            logging.error(f"Error running Gemini: {e}")
+            print(f"{_ERROR} Error running Gemini: {str(e)[:100]}...")
+            logging.error("Error running Gemini: %s", e)
             return None
 
 
@@ -523,7 +588,7 @@ class AgencyParser:
                 pass
 
         except Exception as e:
-            logging.debug(f"JSON parsing failed: {e}")
+            logging.debug("JSON parsing failed: %s", e)
             pass
 
         # Fallback: Parse text-based output
@@ -603,7 +668,7 @@ class DuplicateChecker:
 
         # Check exact name match
         if agency_name in self.existing_names:
-            logging.info(f"   🚫 Duplicate name found: {agency_name}")
+            logging.info("   Duplicate name found: %s", agency_name)
             return True
 
         # Check domain match
@@ -612,12 +677,12 @@ class DuplicateChecker:
             if domain_match:
                 domain = domain_match.group(1).lower()
                 if domain in self.existing_domains:
-                    logging.info(f"   🚫 Duplicate domain found: {domain}")
+                    logging.info("   Duplicate domain found: %s", domain)
                     return True
 
         # Check for fuzzy name matches (similar names)
         if self.is_fuzzy_name_duplicate(agency_name):
-            logging.info(f"   🚫 Fuzzy name duplicate found: {agency_name}")
+            logging.info("   Fuzzy name duplicate found: %s", agency_name)
             return True
 
         return False
@@ -652,34 +717,60 @@ class DuplicateChecker:
         return False
 
 
+class RateLimiter:
+    """Token bucket that paces API calls to a requests-per-minute quota"""
+
+    def __init__(self, requests_per_minute=GEMINI_REQUESTS_PER_MINUTE, burst=1):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request token is available, then consume it"""
+        with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                # Sleep only as long as needed for the next token, so time spent
+                # waiting on the API itself already counts towards the interval
+                time.sleep((1 - self.tokens) / self.rate)
+
+
 class DataEnricher:
     """Handles web search and data enrichment for agencies"""
 
     def __init__(self, gemini_client, db_manager):
         self.gemini_client = gemini_client
         self.db_manager = db_manager
+        self.rate_limiter = RateLimiter()
 
     def fill_missing_data_web_search(self, max_agencies=None):
         """Use Gemini AI to search for missing contact information for gemini_discovered agencies"""
-        print("🔍 Starting web search to fill missing data for gemini_discovered agencies...")
+        print(f"{_SEARCH} Starting web search to fill missing data for gemini_discovered agencies...")
         logging.info("Starting web search to fill missing data for gemini_discovered agencies")
 
         try:
             agencies_to_update = self.db_manager.get_agencies_with_missing_data()
             if not agencies_to_update:
-                print("✅ No agencies found with missing data")
+                print(f"{_OK} No agencies found with missing data")
                 return 0
 
             if max_agencies:
                 agencies_to_update = agencies_to_update[:max_agencies]
 
-            print(f"📋 Found {len(agencies_to_update)} agencies with missing data")
-            logging.info(f"Found {len(agencies_to_update)} agencies with missing data")
+            print(f"{_INFO} Found {len(agencies_to_update)} agencies with missing data")
+            logging.info("Found %s agencies with missing data", len(agencies_to_update))
 
             updated_count = 0
 
             for agency_id, name, website, phone, address, description in agencies_to_update:
-                print(f"\n🔎 Searching for: {name}")
+                print(f"\n{_SEARCH} Searching for: {name}")
 
                 # Determine what data is missing
                 missing_fields = []
@@ -704,9 +795,10 @@ Address: [full address or "Not found"]
 
 Only include factual information from reliable sources."""
 
-                print(f"   🤖 Searching for: {missing_text}")
-                logging.info(f"Searching for missing data for agency: {name}")
+                print(f"   {_AI} Searching for: {missing_text}")
+                logging.info("Searching for missing data for agency: %s", name)
 
+                self.rate_limiter.acquire()
                 response = self.gemini_client.run_gemini_prompt(prompt)
                 if response:
                     # Parse the response
@@ -716,25 +808,23 @@ Only include factual information from reliable sources."""
                         # Update database
                         if self.db_manager.update_agency_data(agency_id, updates):
                             updated_count += 1
-                            print(f"   ✅ Updated: {', '.join([f'{k}: {v}' for k, v in updates.items() if v and v != 'Not found'])}")
-                            logging.info(f"Updated agency {name} with: {updates}")
+                            print(f"   {_OK} Updated: {', '.join([f'{k}: {v}' for k, v in updates.items() if v and v != 'Not found'])}")
+                            logging.info("Updated agency %s with: %s", name, updates)
                         else:
-                            print("   ❌ Failed to update database")
+                            print(f"   {_FAIL} Failed to update database")
                     else:
-                        print("   ⚠️ No useful information found")
+                        print(f"   {_WARN} No useful information found")
+                        self.db_manager.record_search_miss(agency_id)
                 else:
-                    print("   ❌ No response from AI")
+                    print(f"   {_FAIL} No response from AI")
 
-                # Rate limiting
-                time.sleep(2)
-
-            print(f"\n🎉 Completed! Updated {updated_count} agencies with missing data")
-            logging.info(f"Web search data filling complete. Updated {updated_count} agencies")
+            print(f"\n{_DONE} Completed! Updated {updated_count} agencies with missing data")
+            logging.info("Web search data filling complete. Updated %s agencies", updated_count)
             return updated_count
 
         except Exception as e:
-            print(f"💥 Error during web search: {e}")
-            logging.error(f"Error during web search data filling: {e}")
+            print(f"{_ERROR} Error during web search: {e}")
+            logging.error("Error during web search data filling: %s", e)
             return 0
 
     def parse_web_search_response(self, response):
@@ -761,26 +851,26 @@ Only include factual information from reliable sources."""
 
     def update_existing_agency_descriptions(self, max_agencies=None, target_cities=None):
         """Update descriptions for existing agencies using improved detailed prompts"""
-        print("🔄 Starting update of existing agency descriptions...")
-        print("🎯 Using improved prompts to get detailed Marbella connection information")
-        print("=" * 70)
+        print(f"{_RESTART} Starting update of existing agency descriptions...")
+        print(f"{_TARGET} Using improved prompts to get detailed Marbella connection information")
+        print(_SEP)
 
         try:
             agencies_to_update = self.db_manager.get_agencies_needing_description_updates(target_cities=target_cities)
             if not agencies_to_update:
-                print("✅ No agencies found that need description updates")
+                print(f"{_OK} No agencies found that need description updates")
                 return 0
 
             if max_agencies:
                 agencies_to_update = agencies_to_update[:max_agencies]
 
-            print(f"📋 Found {len(agencies_to_update)} agencies needing description updates")
-            logging.info(f"Found {len(agencies_to_update)} agencies needing description updates")
+            print(f"{_INFO} Found {len(agencies_to_update)} agencies needing description updates")
+            logging.info("Found %s agencies needing description updates", len(agencies_to_update))
 
             updated_count = 0
 
             for agency_id, name, website, phone, address, old_description, polish_city in agencies_to_update:
-                print(f"\n🔍 Updating: {name} (from {polish_city or 'unknown city'})")
+                print(f"\n{_SEARCH} Updating: {name} (from {polish_city or 'unknown city'})")
 
                 # Create a targeted prompt to get detailed information about this specific agency
                 prompt = f"""Research the real estate agency "{name}" in {polish_city or 'Poland'} and provide detailed information about their Marbella/Costa del Sol connections.
@@ -799,9 +889,10 @@ Return ONLY a JSON object with this exact format:
 
 Do not include explanations or additional text."""
 
-                print(f"   🤖 Researching detailed Marbella connections...")
-                logging.info(f"Researching detailed description for agency: {name}")
+                print(f"   {_AI} Researching detailed Marbella connections...")
+                logging.info("Researching detailed description for agency: %s", name)
 
+                self.rate_limiter.acquire()
                 response = self.gemini_client.run_gemini_prompt(prompt)
                 if response:
                     # Parse the response to extract the new description
@@ -811,26 +902,23 @@ Do not include explanations or additional text."""
                         # Update the database
                         if self.db_manager.update_agency_description(agency_id, new_description):
                             updated_count += 1
-                            print(f"   ✅ Updated description ({len(new_description)} chars)")
-                            print(f"      📝 New: {new_description[:100]}{'...' if len(new_description) > 100 else ''}")
-                            logging.info(f"Updated description for {name}: {new_description[:100]}...")
+                            print(f"   {_OK} Updated description ({len(new_description)} chars)")
+                            print(f"      {_INFO} New: {new_description[:100]}{'...' if len(new_description) > 100 else ''}")
+                            logging.info("Updated description for %s: %s...", name, new_description[:100])
                         else:
-                            print("   ❌ Failed to update database")
+                            print(f"   {_FAIL} Failed to update database")
                     else:
-                        print("   ⚠️ No improved description found or description unchanged")
+                        print(f"   {_WARN} No improved description found or description unchanged")
                 else:
-                    print("   ❌ No response from AI")
-
-                # Rate limiting between updates
-                time.sleep(2)
+                    print(f"   {_FAIL} No response from AI")
 
-            print(f"\n🎉 Completed! Updated descriptions for {updated_count} agencies")
-            logging.info(f"Description update complete. Updated {updated_count} agencies")
+            print(f"\n{_DONE} Completed! Updated descriptions for {updated_count} agencies")
+            logging.info("Description update complete. Updated %s agencies", updated_count)
             return updated_count
 
         except Exception as e:
-            print(f"💥 Error during description updates: {e}")
-            logging.error(f"Error during description updates: {e}")
+            print(f"{_ERROR} Error during description updates: {e}")
+            logging.error("Error during description updates: %s", e)
             return 0
 
     def extract_description_from_response(self, response):
@@ -884,17 +972,17 @@ class GeminiAgencyFinder:
         processed_prompts = 0
 
         for prompt in prompts[:max_prompts]:
-            logging.info(f"Processing prompt {processed_prompts + 1}/{min(max_prompts, len(prompts))}")
+            logging.info("Processing prompt %s/%s", processed_prompts + 1, min(max_prompts, len(prompts)))
 
             response = self.gemini_client.run_gemini_prompt(prompt, use_web_search)
             if response:
                 agencies = self.agency_parser.parse_agency_data(response)
-                logging.info(f"Found {len(agencies)} potential agencies from this prompt")
+                logging.info("Found %s potential agencies from this prompt", len(agencies))
 
                 # Filter out duplicates
                 new_agencies = [a for a in agencies if not self.duplicate_checker.is_duplicate(a)]
                 all_agencies.extend(new_agencies)
-                logging.info(f"Added {len(new_agencies)} new agencies (filtered duplicates)")
+                logging.info("Added %s new agencies (filtered duplicates)", len(new_agencies))
 
             processed_prompts += 1
 
@@ -914,28 +1002,28 @@ class GeminiAgencyFinder:
         # Save to database
         saved_count = self.db_manager.save_agencies(unique_agencies)
 
-        logging.info(f"Discovery complete. Found {len(unique_agencies)} unique agencies, saved {saved_count} to database.")
+        logging.info("Discovery complete. Found %s unique agencies, saved %s to database.", len(unique_agencies), saved_count)
         return saved_count
 
     def run_targeted_polish_search(self, target_agencies=50, use_context=True, max_iterations=None):
         """Run targeted searches for specific Polish towns with context-aware prompting until target reached"""
-        print(f"🚀 Starting targeted Polish town agency discovery...")
-        print(f"🎯 Target: {target_agencies} new agencies")
-        print("=" * 60)
+        print(f"{_START} Starting targeted Polish town agency discovery...")
+        print(f"{_TARGET} Target: {target_agencies} new agencies")
+        print(_SEP)
 
-        logging.info(f"Starting targeted Polish town agency discovery... Target: {target_agencies} new agencies")
+        logging.info("Starting targeted Polish town agency discovery... Target: %s new agencies", target_agencies)
 
         # Get unscanned cities
         scanned_cities = self.get_scanned_cities()
         all_polish_towns = self.get_polish_towns()
         unscanned_cities = [city for city in all_polish_towns if city not in scanned_cities]
 
-        print(f"🏙️ Cities available: {len(all_polish_towns)}")
-        print(f"✅ Cities already scanned: {len(scanned_cities)}")
-        print(f"🎯 Cities to scan: {len(unscanned_cities)}")
+        print(f"{_CITY} Cities available: {len(all_polish_towns)}")
+        print(f"{_OK} Cities already scanned: {len(scanned_cities)}")
+        print(f"{_TARGET} Cities to scan: {len(unscanned_cities)}")
 
         if not unscanned_cities:
-            print("⚠️ All cities have been scanned! Restarting from the beginning...")
+            print(f"{_WARN} All cities have been scanned! Restarting from the beginning...")
             logging.warning("All cities have been scanned, restarting from beginning")
             unscanned_cities = all_polish_towns.copy()
 
@@ -948,8 +1036,8 @@ class GeminiAgencyFinder:
 
         while total_saved < target_agencies and (max_iterations is None or iteration < max_iterations):
             iteration += 1
-            print(f"\n📊 Iteration {iteration} - Progress: {total_saved}/{target_agencies} agencies")
-            logging.info(f"=== Iteration {iteration} === Total agencies found so far: {total_saved}")
+            print(f"\n{_STATS} Iteration {iteration} - Progress: {total_saved}/{target_agencies} agencies")
+            logging.info("=== Iteration %s === Total agencies found so far: %s", iteration, total_saved)
 
             # Refresh existing agencies context for each iteration
             existing_agencies_by_city = self.db_manager.get_existing_agencies_by_city() if use_context else {}
@@ -957,24 +1045,24 @@ class GeminiAgencyFinder:
             # Process towns in batches from unscanned cities
             towns_batch = unscanned_cities[processed_towns:processed_towns + 5]  # Process 5 towns per iteration
             if not towns_batch:
-                print("🔄 All unscanned cities processed, restarting from beginning...")
+                print(f"{_RESTART} All unscanned cities processed, restarting from beginning...")
                 logging.info("All unscanned cities processed, restarting from beginning...")
                 processed_towns = 0
                 towns_batch = unscanned_cities[:5] if unscanned_cities else all_polish_towns[:5]
 
-            print(f"🏘️ Processing cities: {', '.join(towns_batch)}")
+            print(f"{_CITY} Processing cities: {', '.join(towns_batch)}")
 
             for town_idx, town in enumerate(towns_batch, 1):
-                print(f"\n🏙️ [{town_idx}/5] Scanning {town}, Poland...")
-                logging.info(f"🔍 Searching for agencies in {town}, Poland...")
+                print(f"\n{_CITY} [{town_idx}/5] Scanning {town}, Poland...")
+                logging.info("Searching for agencies in %s, Poland...", town)
 
                 # Get existing agencies for this city to exclude them
                 existing_agencies = existing_agencies_by_city.get(town, [])
                 exclude_text = ""
                 if existing_agencies:
                     exclude_text = f" Exclude these agencies we already know about: {', '.join(existing_agencies[:5])}. "
-                    print(f"   📋 Excluding {len(existing_agencies)} known agencies")
-                    logging.info(f"   📋 Excluding {len(existing_agencies)} known agencies from {town}")
+                    print(f"   {_INFO} Excluding {len(existing_agencies)} known agencies")
+                    logging.info("   Excluding %s known agencies from %s", len(existing_agencies), town)
 
                 # Create targeted prompts with structured JSON output - optimized for efficiency and detailed descriptions
                 prompts = [
@@ -1017,21 +1105,21 @@ If no agencies are found, return an empty array []. Do not include explanations
                 town_agencies = []
                 for i, prompt in enumerate(prompts, 1):
                     try:
-                        print(f"   🤖 [{i}/5] Querying AI...")
-                        logging.info(f"   🤖 Prompt {i}/5: {prompt[:80]}...")
+                        print(f"   {_AI} [{i}/5] Querying AI...")
+                        logging.info("   Prompt %s/5: %s...", i, prompt[:80])
                         response = self.gemini_client.run_gemini_prompt(prompt)
                         if response:
                             agencies = self.agency_parser.parse_agency_data(response, town)
-                            print(f"   📄 Found {len(agencies)} potential agencies")
-                            logging.info(f"   📄 Response received ({len(response)} chars)")
-                            logging.info(f"   🔍 Parsed {len(agencies)} potential agencies from response")
+                            print(f"   {_INFO} Found {len(agencies)} potential agencies")
+                            logging.info("   Response received (%s chars)", len(response))
+                            logging.info("   Parsed %s potential agencies from response", len(agencies))
                             town_agencies.extend(agencies)
                         else:
-                            print(f"   ❌ No response for prompt {i}")
-                            logging.warning(f"   ❌ No response received for prompt {i}")
+                            print(f"   {_FAIL} No response for prompt {i}")
+                            logging.warning("   No response received for prompt %s", i)
                     except Exception as e:
-                        print(f"   💥 Error processing prompt {i}: {str(e)[:50]}...")
-                        logging.error(f"Error processing prompt {i} for {town}: {e}")
+                        print(f"   {_ERROR} Error processing prompt {i}: {str(e)[:50]}...")
+                        logging.error("Error processing prompt %s for %s: %s", i, town, e)
                         continue
 
                     time.sleep(1)  # Rate limiting between prompts
@@ -1039,13 +1127,13 @@ If no agencies are found, return an empty array []. Do not include explanations
                 # Filter duplicates for this town
                 new_agencies = [a for a in town_agencies if not self.duplicate_checker.is_duplicate(a)]
                 all_agencies.extend(new_agencies)
-                print(f"   ✅ {len(new_agencies)} new agencies found for {town}")
-                logging.info(f"   ✅ Found {len(new_agencies)} new agencies for {town}")
+                print(f"   {_OK} {len(new_agencies)} new agencies found for {town}")
+                logging.info("   Found %s new agencies for %s", len(new_agencies), town)
 
                 # Log details of new agencies found
                 for agency in new_agencies[:3]:  # Show first 3
-                    print(f"      ➕ {agency['name']}")
-                    logging.info(f"      ➕ NEW: {agency['name']} - {agency.get('website', 'No website')}")
+                    print(f"      {_NEW} {agency['name']}")
+                    logging.info("      NEW: %s - %s", agency['name'], agency.get('website', 'No website'))
 
                 if len(new_agencies) > 3:
                     print(f"      ... and {len(new_agencies) - 3} more")
@@ -1060,50 +1148,50 @@ If no agencies are found, return an empty array []. Do not include explanations
                     unique_agencies.append(agency)
 
             # Save to database
-            print(f"\n💾 Saving {len(unique_agencies)} agencies to database...")
+            print(f"\n{_SAVE} Saving {len(unique_agencies)} agencies to database...")
             batch_saved = self.db_manager.save_agencies(unique_agencies)
             total_saved += batch_saved
 
-            print(f"✅ Batch complete: {batch_saved} agencies saved")
-            print(f"📊 Total progress: {total_saved}/{target_agencies} agencies")
+            print(f"{_OK} Batch complete: {batch_saved} agencies saved")
+            print(f"{_STATS} Total progress: {total_saved}/{target_agencies} agencies")
 
-            logging.info(f"📊 Batch complete: Found {len(unique_agencies)} unique agencies, saved {batch_saved} to database")
-            logging.info(f"🎯 Progress: {total_saved}/{target_agencies} total agencies saved")
+            logging.info("Batch complete: Found %s unique agencies, saved %s to database", len(unique_agencies), batch_saved)
+            logging.info("Progress: %s/%s total agencies saved", total_saved, target_agencies)
 
             processed_towns += len(towns_batch)
 
             # Check if we've reached the target
             if total_saved >= target_agencies:
-                print(f"\n🎉 TARGET REACHED! Found {total_saved} new agencies")
-                logging.info(f"🎉 Target reached! Found {total_saved} new agencies")
+                print(f"\n{_DONE} TARGET REACHED! Found {total_saved} new agencies")
+                logging.info("Target reached! Found %s new agencies", total_saved)
                 break
 
             # Rate limiting between batches
             if iteration < 10:  # Don't wait on last few iterations
-                print("⏳ Waiting 3 seconds before next batch...")
-                logging.info("⏳ Waiting 3 seconds before next batch...")
+                print(f"{_WAIT} Waiting 3 seconds before next batch...")
+                logging.info("Waiting 3 seconds before next batch...")
                 time.sleep(3)
 
-        print(f"\n🏁 Search complete! Total agencies found: {total_saved}")
-        logging.info(f"🏁 Targeted search complete. Total agencies found: {total_saved}")
+        print(f"\n{_DONE} Search complete! Total agencies found: {total_saved}")
+        logging.info("Targeted search complete. Total agencies found: %s", total_saved)
         return total_saved
 
     def run_single_city_scan(self, city_name=None, target_agencies=10, max_iterations=None, scan_all_pending=False):
         """Run targeted search across multiple cities until target agencies found or all pending cities scanned"""
         if scan_all_pending:
             logging.info("Starting comprehensive scan of ALL pending cities...")
-            print("🏙️ Scanning ALL pending cities with no agency limit")
+            print(f"{_CITY} Scanning ALL pending cities with no agency limit")
         else:
-            logging.info(f"Starting multi-city scan... Target: {target_agencies} agencies total")
-            print(f"🏙️ Will scan cities continuously until {target_agencies} agencies found")
+            logging.info("Starting multi-city scan... Target: %s agencies total", target_agencies)
+            print(f"{_CITY} Will scan cities continuously until {target_agencies} agencies found")
 
         polish_towns = self.get_polish_towns()
         total_found = 0
         cities_scanned = 0
         iteration = 0
 
-        print(f"📋 Total cities available: {len(polish_towns)}")
-        print("=" * 60)
+        print(f"{_INFO} Total cities available: {len(polish_towns)}")
+        print(_SEP)
 
         # If specific city requested, prioritize it
         if city_name and not scan_all_pending:
@@ -1111,23 +1199,23 @@ If no agencies are found, return an empty array []. Do not include explanations
                 polish_towns.remove(city_name)
                 polish_towns.insert(0, city_name)
             else:
-                print(f"⚠️ City '{city_name}' not found in cities list, starting with first city")
+                print(f"{_WARN} City '{city_name}' not found in cities list, starting with first city")
 
         while (not scan_all_pending and total_found < target_agencies) or (scan_all_pending and True):
             iteration += 1
             if scan_all_pending:
-                print(f"\n📊 Iteration {iteration} - Total agencies found so far: {total_found}")
-                logging.info(f"=== Iteration {iteration} === Total agencies found so far: {total_found}")
+                print(f"\n{_STATS} Iteration {iteration} - Total agencies found so far: {total_found}")
+                logging.info("=== Iteration %s === Total agencies found so far: %s", iteration, total_found)
             else:
-                print(f"\n📊 Iteration {iteration} - Progress: {total_found}/{target_agencies} agencies")
-                logging.info(f"=== Iteration {iteration} === Total agencies found so far: {total_found}")
+                print(f"\n{_STATS} Iteration {iteration} - Progress: {total_found}/{target_agencies} agencies")
+                logging.info("=== Iteration %s === Total agencies found so far: %s", iteration, total_found)
 
             # Get unscanned cities for this iteration
             scanned_cities = self.get_scanned_cities()
             unscanned_cities = [city for city in polish_towns if city not in scanned_cities]
 
             if not unscanned_cities:
-                print("✅ All cities have been scanned! No pending cities to process.")
+                print(f"{_OK} All cities have been scanned! No pending cities to process.")
                 logging.info("All cities have been scanned, no pending cities to process")
                 break
 
@@ -1138,10 +1226,10 @@ If no agencies are found, return an empty array []. Do not include explanations
 
                 cities_scanned += 1
                 if scan_all_pending:
-                    print(f"\n🏙️ [{cities_scanned}] Scanning {city}, Poland... (Total agencies: {total_found})")
+                    print(f"\n{_CITY} [{cities_scanned}] Scanning {city}, Poland... (Total agencies: {total_found})")
                 else:
-                    print(f"\n🏙️ [{cities_scanned}] Scanning {city}, Poland... (Progress: {total_found}/{target_agencies})")
-                logging.info(f"🔍 Scanning city {cities_scanned}: {city}, Poland...")
+                    print(f"\n{_CITY} [{cities_scanned}] Scanning {city}, Poland... (Progress: {total_found}/{target_agencies})")
+                logging.info("Scanning city %s: %s, Poland...", cities_scanned, city)
 
                 # Get existing agencies for this city to exclude them
                 existing_agencies_by_city = self.db_manager.get_existing_agencies_by_city()
@@ -1149,8 +1237,8 @@ If no agencies are found, return an empty array []. Do not include explanations
                 exclude_text = ""
                 if existing_agencies:
                     exclude_text = f" Exclude these agencies we already know about: {', '.join(existing_agencies[:5])}. "
-                    print(f"   📋 Excluding {len(existing_agencies)} known agencies")
-                    logging.info(f"   📋 Excluding {len(existing_agencies)} known agencies from {city}")
+                    print(f"   {_INFO} Excluding {len(existing_agencies)} known agencies")
+                    logging.info("   Excluding %s known agencies from %s", len(existing_agencies), city)
 
                 # Create targeted prompts with structured JSON output - optimized for efficiency
                 prompts = [
@@ -1202,18 +1290,18 @@ If no agencies are found, return an empty array []. Do not include explanations
 
                 city_agencies = []
                 for i, prompt in enumerate(prompts, 1):
-                    print(f"   🤖 [{i}/5] Querying AI...")
-                    logging.info(f"   🤖 Prompt {i}/5: {prompt[:80]}...")
+                    print(f"   {_AI} [{i}/5] Querying AI...")
+                    logging.info("   Prompt %s/5: %s...", i, prompt[:80])
                     response = self.gemini_client.run_gemini_prompt(prompt)
                     if response:
                         agencies = self.agency_parser.parse_agency_data(response, city)
-                        print(f"   📄 Found {len(agencies)} potential agencies")
-                        logging.info(f"   📄 Response received ({len(response)} chars)")
-                        logging.info(f"   🔍 Parsed {len(agencies)} potential agencies from response")
+                        print(f"   {_INFO} Found {len(agencies)} potential agencies")
+                        logging.info("   Response received (%s chars)", len(response))
+                        logging.info("   Parsed %s potential agencies from response", len(agencies))
                         city_agencies.extend(agencies)
                     else:
-                        print(f"   ❌ No response for prompt {i}")
-                        logging.warning(f"   ❌ No response received for prompt {i}")
+                        print(f"   {_FAIL} No response for prompt {i}")
+                        logging.warning("   No response received for prompt %s", i)
 
                     time.sleep(1)  # Rate limiting between prompts
 
@@ -1221,13 +1309,13 @@ If no agencies are found, return an empty array []. Do not include explanations
                 new_agencies = [a for a in city_agencies if not self.duplicate_checker.is_duplicate(a)]
                 city_found = len(new_agencies)
 
-                print(f"   ✅ {city_found} new agencies found in {city}")
-                logging.info(f"   ✅ Found {city_found} new agencies for {city}")
+                print(f"   {_OK} {city_found} new agencies found in {city}")
+                logging.info("   Found %s new agencies for %s", city_found, city)
 
                 # Log details of new agencies found
                 for agency in new_agencies[:3]:  # Show first 3
-                    print(f"      ➕ {agency['name']}")
-                    logging.info(f"      ➕ NEW: {agency['name']} - {agency.get('website', 'No website')}")
+                    print(f"      {_NEW} {agency['name']}")
+                    logging.info("      NEW: %s - %s", agency['name'], agency.get('website', 'No website'))
 
                 if city_found > 3:
                     print(f"      ... and {city_found - 3} more")
@@ -1240,17 +1328,17 @@ If no agencies are found, return an empty array []. Do not include explanations
                 self.update_city_tracking(city, city_found)
 
                 if scan_all_pending:
-                    print(f"   💾 Saved {saved_count} agencies (Total: {total_found})")
+                    print(f"   {_SAVE} Saved {saved_count} agencies (Total: {total_found})")
                 else:
-                    print(f"   💾 Saved {saved_count} agencies (Total: {total_found}/{target_agencies})")
+                    print(f"   {_SAVE} Saved {saved_count} agencies (Total: {total_found}/{target_agencies})")
 
                 # Check if we've reached the target (only for non-scan_all_pending mode)
                 if not scan_all_pending and total_found >= target_agencies:
-                    print(f"\n🎉 TARGET REACHED! Found {total_found} agencies across {cities_scanned} cities")
+                    print(f"\n{_DONE} TARGET REACHED! Found {total_found} agencies across {cities_scanned} cities")
                     break
 
                 # Rate limiting between cities
-                print("⏳ Moving to next city...")
+                print(f"{_WAIT} Moving to next city...")
                 time.sleep(2)
 
             # Check if we've reached the target after this iteration (only for non-scan_all_pending mode)
@@ -1259,18 +1347,18 @@ If no agencies are found, return an empty array []. Do not include explanations
 
             # Prevent infinite loops - if we've done too many iterations without progress, stop
             if iteration >= 10 and total_found == 0:
-                print("⚠️ No agencies found after 10 iterations, stopping to prevent infinite loop")
+                print(f"{_WARN} No agencies found after 10 iterations, stopping to prevent infinite loop")
                 logging.warning("No agencies found after 10 iterations, stopping")
                 break
 
         if scan_all_pending:
-            print(f"\n🏁 Comprehensive scan complete!")
-            print(f"📊 Results: {total_found} agencies found across {cities_scanned} cities in {iteration} iterations")
-            logging.info(f"🏁 Comprehensive scan complete. Found {total_found} agencies across {cities_scanned} cities in {iteration} iterations")
+            print(f"\n{_DONE} Comprehensive scan complete!")
+            print(f"{_STATS} Results: {total_found} agencies found across {cities_scanned} cities in {iteration} iterations")
+            logging.info("Comprehensive scan complete. Found %s agencies across %s cities in %s iterations", total_found, cities_scanned, iteration)
         else:
-            print(f"\n🏁 Multi-city scan complete!")
-            print(f"📊 Results: {total_found} agencies found across {cities_scanned} cities in {iteration} iterations")
-            logging.info(f"🏁 Multi-city scan complete. Found {total_found} agencies across {cities_scanned} cities in {iteration} iterations")
+            print(f"\n{_DONE} Multi-city scan complete!")
+            print(f"{_STATS} Results: {total_found} agencies found across {cities_scanned} cities in {iteration} iterations")
+            logging.info("Multi-city scan complete. Found %s agencies across %s cities in %s iterations", total_found, cities_scanned, iteration)
         return total_found
 
     def get_scanned_cities(self):
@@ -1305,11 +1393,11 @@ If no agencies are found, return an empty array []. Do not include explanations
                     # End of table
                     break
 
-            logging.info(f"Found {len(scanned_cities)} scanned cities from tracking file")
+            logging.info("Found %s scanned cities from tracking file", len(scanned_cities))
             return scanned_cities
 
         except Exception as e:
-            logging.error(f"Error getting scanned cities from tracking file: {e}")
+            logging.error("Error getting scanned cities from tracking file: %s", e)
             return set()
 
     def update_city_tracking(self, city_name, agencies_found):
@@ -1352,10 +1440,10 @@ If no agencies are found, return an empty array []. Do not include explanations
             with open('polish-cities-tracking.md', 'w', encoding='utf-8') as f:
                 f.write(updated_content)
 
-            logging.info(f"Updated tracking file for city: {city_name}")
+            logging.info("Updated tracking file for city: %s", city_name)
 
         except Exception as e:
-            logging.error(f"Error updating city tracking: {e}")
+            logging.error("Error updating city tracking: %s", e)
 
     def fill_missing_data_web_search(self, max_agencies=None):
         """Use Gemini AI to search for missing contact information for gemini_discovered agencies"""
@@ -1367,9 +1455,9 @@ If no agencies are found, return an empty array []. Do not include explanations
 
     def calculate_agencies_per_call(self, sample_city="Warsaw"):
         """Calculate estimated agencies per API call based on current prompt optimization"""
-        print("🧮 Calculating agencies per API call efficiency...")
-        print(f"📍 Using sample city: {sample_city}")
-        print("=" * 50)
+        print(f"{_STATS} Calculating agencies per API call efficiency...")
+        print(f"{_CITY} Using sample city: {sample_city}")
+        print(_SEP)
 
         # Test one of our optimized prompts
         test_prompt = f"""Find up to 15 real estate agencies in {sample_city}, Poland that specialize in Costa del Sol, Marbella, or international properties.
@@ -1381,30 +1469,30 @@ Return ONLY a JSON array with this exact format:
 
 If no agencies are found, return an empty array []. Do not include explanations or additional text."""
 
-        print(f"🤖 Testing prompt ({len(test_prompt)} chars)...")
+        print(f"{_AI} Testing prompt ({len(test_prompt)} chars)...")
         response = self.gemini_client.run_gemini_prompt(test_prompt)
 
         if response:
             agencies = self.agency_parser.parse_agency_data(response, sample_city)
-            print(f"✅ Response received ({len(response)} chars)")
-            print(f"📊 Agencies parsed: {len(agencies)}")
+            print(f"{_OK} Response received ({len(response)} chars)")
+            print(f"{_STATS} Agencies parsed: {len(agencies)}")
 
             # Calculate token usage estimates
             # Rough estimate: 4 chars per token
             input_tokens = len(test_prompt) // 4
             output_tokens = len(response) // 4
 
-            print(f"🔢 Estimated input tokens: ~{input_tokens}")
-            print(f"🔢 Estimated output tokens: ~{output_tokens}")
-            print(f"🔢 Total tokens per call: ~{input_tokens + output_tokens}")
+            print(f"{_STATS} Estimated input tokens: ~{input_tokens}")
+            print(f"{_STATS} Estimated output tokens: ~{output_tokens}")
+            print(f"{_STATS} Total tokens per call: ~{input_tokens + output_tokens}")
 
             # Gemini 2.5 Flash free tier estimates (based on typical limits)
             # Assuming generous free tier: ~1M tokens/day or ~1000 requests/day
             estimated_daily_calls = min(1000, 1000000 // (input_tokens + output_tokens)) if (input_tokens + output_tokens) > 0 else 1000
 
-            print(f"📈 Estimated daily API calls within free tier: ~{estimated_daily_calls}")
-            print(f"🎯 Agencies per call: {len(agencies)}")
-            print(f"🚀 Daily agency discovery potential: ~{len(agencies) * estimated_daily_calls}")
+            print(f"{_STATS} Estimated daily API calls within free tier: ~{estimated_daily_calls}")
+            print(f"{_TARGET} Agencies per call: {len(agencies)}")
+            print(f"{_START} Daily agency discovery potential: ~{len(agencies) * estimated_daily_calls}")
 
             return {
                 'agencies_per_call': len(agencies),
@@ -1415,7 +1503,7 @@ If no agencies are found, return an empty array []. Do not include explanations
                 'daily_agency_potential': len(agencies) * estimated_daily_calls
             }
         else:
-            print("❌ No response received")
+            print(f"{_FAIL} No response received")
             return None
 
     def get_polish_towns(self):
@@ -1494,44 +1582,44 @@ If no agencies are found, return an empty array []. Do not include explanations
         """Run all cleanup tools automatically"""
         try:
             # Run name cleaning
-            print("   🔧 Running name cleaning...")
+            print(f"   {_RUN} Running name cleaning...")
             result = subprocess.run([sys.executable, 'tools/clean_names.py'],
                                   capture_output=True, text=True, cwd=os.getcwd())
             if result.returncode == 0:
-                print("   ✅ Name cleaning completed")
+                print(f"   {_OK} Name cleaning completed")
             else:
-                print(f"   ⚠️ Name cleaning had issues: {result.stderr[:100]}")
+                print(f"   {_WARN} Name cleaning had issues: {result.stderr[:100]}")
 
             # Run website fixing
-            print("   🔧 Running website extraction...")
+            print(f"   {_RUN} Running website extraction...")
             result = subprocess.run([sys.executable, 'tools/fix_websites.py'],
                                   capture_output=True, text=True, cwd=os.getcwd())
             if result.returncode == 0:
-                print("   ✅ Website extraction completed")
+                print(f"   {_OK} Website extraction completed")
             else:
-                print(f"   ⚠️ Website extraction had issues: {result.stderr[:100]}")
+                print(f"   {_WARN} Website extraction had issues: {result.stderr[:100]}")
 
             # Run duplicate removal
-            print("   🔧 Running duplicate removal...")
+            print(f"   {_RUN} Running duplicate removal...")
             result = subprocess.run([sys.executable, 'tools/remove_duplicates.py'],
                                   capture_output=True, text=True, cwd=os.getcwd())
             if result.returncode == 0:
-                print("   ✅ Duplicate removal completed")
+                print(f"   {_OK} Duplicate removal completed")
             else:
-                print(f"   ⚠️ Duplicate removal had issues: {result.stderr[:100]}")
+                print(f"   {_WARN} Duplicate removal had issues: {result.stderr[:100]}")
 
             # Run type classification
-            print("   🔧 Running type classification...")
+            print(f"   {_RUN} Running type classification...")
             result = subprocess.run([sys.executable, 'tools/update_types.py'],
                                   capture_output=True, text=True, cwd=os.getcwd())
             if result.returncode == 0:
-                print("   ✅ Type classification completed")
+                print(f"   {_OK} Type classification completed")
             else:
-                print(f"   ⚠️ Type classification had issues: {result.stderr[:100]}")
+                print(f"   {_WARN} Type classification had issues: {result.stderr[:100]}")
 
         except Exception as e:
-            print(f"   💥 Error running cleanup tools: {e}")
-            logging.error(f"Error running cleanup tools: {e}")
+            print(f"   {_ERROR} Error running cleanup tools: {e}")
+            logging.error("Error running cleanup tools: %s", e)
 
 
 def main():
@@ -1555,15 +1643,15 @@ if __name__ == '__main__':
                 print("Invalid target number, using default of 50")
 
         polish_towns = finder.get_polish_towns()
-        print(f"🎯 Running targeted searches for {len(polish_towns)} Polish towns...")
-        print(f"🎯 Target: {target_agencies} new agencies")
-        print("=" * 60)
+        print(f"{_TARGET} Running targeted searches for {len(polish_towns)} Polish towns...")
+        print(f"{_TARGET} Target: {target_agencies} new agencies")
+        print(_SEP)
 
         saved_count = finder.run_targeted_polish_search(target_agencies=target_agencies, use_context=True)
 
-        print("=" * 60)
-        print(f"🎉 COMPLETED: Successfully added {saved_count} new agencies to the database!")
-        print("📊 Check gemini_agency_finder.log for detailed operation logs")
+        print(_SEP)
+        print(f"{_DONE} COMPLETED: Successfully added {saved_count} new agencies to the database!")
+        print(f"{_STATS} Check gemini_agency_finder.log for detailed operation logs")
 
     elif len(sys.argv) > 1 and sys.argv[1] == '--single':
         # Run single city scan
@@ -1584,23 +1672,23 @@ if __name__ == '__main__':
                 print("Invalid target number, using default of 10")
 
         if scan_all_pending:
-            print("🏙️ Scanning ALL pending cities with no agency limit")
-            print("=" * 60)
+            print(f"{_CITY} Scanning ALL pending cities with no agency limit")
+            print(_SEP)
             saved_count = finder.run_single_city_scan(scan_all_pending=True)
         else:
-            print(f"🏙️ Running single city scan...")
+            print(f"{_CITY} Running single city scan...")
             if city_name:
-                print(f"🎯 Target City: {city_name}")
+                print(f"{_TARGET} Target City: {city_name}")
             else:
-                print("🎯 Target: Next unscanned city")
-            print(f"🎯 Target Agencies: {target_agencies}")
-            print("=" * 60)
+                print(f"{_TARGET} Target: Next unscanned city")
+            print(f"{_TARGET} Target Agencies: {target_agencies}")
+            print(_SEP)
             saved_count = finder.run_single_city_scan(city_name=city_name, target_agencies=target_agencies)
 
-        print("=" * 60)
-        print(f"🎉 COMPLETED: Successfully added {saved_count} new agencies to the database!")
-        print("📊 Check gemini_agency_finder.log for detailed operation logs")
-        print("📋 Tracking file updated automatically")
+        print(_SEP)
+        print(f"{_DONE} COMPLETED: Successfully added {saved_count} new agencies to the database!")
+        print(f"{_STATS} Check gemini_agency_finder.log for detailed operation logs")
+        print(f"{_INFO} Tracking file updated automatically")
 
     elif len(sys.argv) > 1 and sys.argv[1] == '--fill-missing':
         # Fill missing data using web search
@@ -1611,18 +1699,18 @@ if __name__ == '__main__':
             except ValueError:
                 print("Invalid number, processing all agencies with missing data")
 
-        print("🔍 Filling missing data for gemini_discovered agencies...")
+        print(f"{_SEARCH} Filling missing data for gemini_discovered agencies...")
         if max_agencies:
-            print(f"🎯 Max agencies to process: {max_agencies}")
+            print(f"{_TARGET} Max agencies to process: {max_agencies}")
         else:
-            print("🎯 Processing all agencies with missing data")
-        print("=" * 60)
+            print(f"{_TARGET} Processing all agencies with missing data")
+        print(_SEP)
 
         updated_count = finder.fill_missing_data_web_search(max_agencies=max_agencies)
 
-        print("=" * 60)
-        print(f"🎉 COMPLETED: Successfully updated {updated_count} agencies with missing data!")
-        print("📊 Check gemini_agency_finder.log for detailed operation logs")
+        print(_SEP)
+        print(f"{_DONE} COMPLETED: Successfully updated {updated_count} agencies with missing data!")
+        print(f"{_STATS} Check gemini_agency_finder.log for detailed operation logs")
 
     elif len(sys.argv) > 1 and sys.argv[1] == '--update-descriptions':
         # Update existing agency descriptions with improved detailed prompts
@@ -1639,20 +1727,20 @@ if __name__ == '__main__':
             # Parse city names (comma-separated)
             target_cities = [city.strip() for city in sys.argv[3].split(',') if city.strip()]
 
-        print("🔄 Updating existing agency descriptions with improved Marbella connection details...")
+        print(f"{_RESTART} Updating existing agency descriptions with improved Marbella connection details...")
         if max_agencies:
-            print(f"🎯 Max agencies to process: {max_agencies}")
+            print(f"{_TARGET} Max agencies to process: {max_agencies}")
         if target_cities:
-            print(f"🎯 Target cities: {', '.join(target_cities)}")
+            print(f"{_TARGET} Target cities: {', '.join(target_cities)}")
         else:
-            print("🎯 Processing all cities")
-        print("=" * 70)
+            print(f"{_TARGET} Processing all cities")
+        print(_SEP)
 
         updated_count = finder.update_existing_agency_descriptions(max_agencies=max_agencies, target_cities=target_cities)
 
-        print("=" * 70)
-        print(f"🎉 COMPLETED: Successfully updated descriptions for {updated_count} agencies!")
-        print("📊 Check gemini_agency_finder.log for detailed operation logs")
+        print(_SEP)
+        print(f"{_DONE} COMPLETED: Successfully updated descriptions for {updated_count} agencies!")
+        print(f"{_STATS} Check gemini_agency_finder.log for detailed operation logs")
 
     else:
         main()
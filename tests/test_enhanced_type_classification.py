@@ -0,0 +1,56 @@
+import sqlite3
+
+import pytest
+
+from enhanced_type_classification import determine_enhanced_type, main
+
+# (name, website, phone, address, description, type) -> expected type
+AGENCIES = [
+    (('Agencja Polska', 'https://agencja.pl', '+48 22 123 45 67', 'ul. Marszałkowska 1, Warsaw',
+      'Biuro w ŁÓDŹ', 'gemini_discovered'), 'polish'),
+    (('Marbella Homes', 'https://marbellahomes.es', '+34 952 000 000', 'Calle Mayor 1, Marbella',
+      'Villas on the Costa del Sol', 'gemini_discovered'), 'marbella'),
+    (('Sun Estates', 'https://sun-estates.es', '+48 600 000 000', None, None, 'gemini_discovered'),
+     'spain&poland'),
+    (('Costa Partners', None, None, None, 'Obsługa klientów POLISH', 'gemini_discovered'), 'both'),
+    # Only Python's lower() folds 'ŁÓDŹ' to the 'łódź' keyword
+    (('Dom Costa', None, None, None, 'Oddział w ŁÓDŹ', 'gemini_discovered'), 'both'),
+    (('Nieznana', None, None, None, None, 'undefined'), 'undefined'),
+    (('Numer', None, 48221234567, None, None, 'gemini_discovered'), 'polish'),
+    (('Lublin Office', None, None, 'Lublin', None, 'marbella'), 'polish'),
+]
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:')
+    conn.execute('''
+        CREATE TABLE agencies (
+            id INTEGER PRIMARY KEY, name TEXT, website TEXT, phone TEXT,
+            address TEXT, description TEXT, type TEXT
+        )
+    ''')
+    conn.executemany('INSERT INTO agencies (name, website, phone, address, description, type) VALUES (?, ?, ?, ?, ?, ?)',
+                     [fields for fields, _ in AGENCIES])
+    conn.commit()
+    yield conn
+    conn.close()
+
+@pytest.mark.parametrize('fields, expected', AGENCIES)
+def test_determine_enhanced_type(fields, expected):
+    assert determine_enhanced_type(*fields) == expected
+
+def test_main_matches_python_rules(conn):
+    rows = conn.execute('SELECT id, name, website, phone, address, description, type FROM agencies').fetchall()
+    expected = {row[0]: determine_enhanced_type(*row[1:]) for row in rows}
+
+    main(conn)
+
+    assert dict(conn.execute('SELECT id, type FROM agencies')) == expected
+
+def test_main_is_idempotent(conn):
+    main(conn)
+    first = conn.execute('SELECT id, type FROM agencies ORDER BY id').fetchall()
+
+    main(conn)
+
+    assert conn.execute('SELECT id, type FROM agencies ORDER BY id').fetchall() == first
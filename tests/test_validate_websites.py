@@ -0,0 +1,53 @@
+import pytest
+
+pytest.importorskip('requests')
+
+from validate_websites import AdaptiveConcurrency, is_valid_url
+
+def complete_round(concurrency, latency, ok):
+    """Acquire and release limit checks, i.e. one adjustment round"""
+    for _ in range(concurrency.limit):
+        concurrency.acquire()
+        concurrency.release(latency, ok)
+
+def test_fast_responses_raise_limit_by_one():
+    concurrency = AdaptiveConcurrency(initial=4, minimum=1, maximum=8, target_latency=1.0)
+    complete_round(concurrency, 0.1, True)
+    assert concurrency.limit == 5
+
+def test_limit_stops_at_maximum():
+    concurrency = AdaptiveConcurrency(initial=7, minimum=1, maximum=8, target_latency=1.0)
+    for _ in range(3):
+        complete_round(concurrency, 0.1, True)
+    assert concurrency.limit == 8
+
+def test_slow_responses_halve_limit():
+    concurrency = AdaptiveConcurrency(initial=8, minimum=1, maximum=16, target_latency=1.0)
+    complete_round(concurrency, 2.5, True)
+    assert concurrency.limit == 4
+
+def test_moderate_latency_holds_limit():
+    concurrency = AdaptiveConcurrency(initial=8, minimum=1, maximum=16, target_latency=1.0)
+    complete_round(concurrency, 1.5, True)
+    assert concurrency.limit == 8
+
+def test_mostly_failing_round_halves_limit_down_to_minimum():
+    concurrency = AdaptiveConcurrency(initial=4, minimum=2, maximum=16, target_latency=1.0,
+                                      overload_failure_share=0.5)
+    complete_round(concurrency, 0.1, False)
+    assert concurrency.limit == 2
+    complete_round(concurrency, 0.1, False)
+    assert concurrency.limit == 2
+
+@pytest.mark.parametrize('url, expected', [
+    ('https://example.com', True),
+    ('http://example.pl/o-nas?x=1#top', True),
+    ('https://biuro-nieruchomości.pl', True),
+    ('http://[::1]:8080/', True),
+    ('example.com', False),
+    ('https://', False),
+    ('notaurl', False),
+    ('', False),
+])
+def test_is_valid_url(url, expected):
+    assert is_valid_url(url) == expected
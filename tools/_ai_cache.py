@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+SQLite-backed cache for Gemini responses.
+
+Parsed responses are stored as JSON in the ai_cache table of agencies.db,
+keyed by a sha1 of the prompt inputs, so reruns over unchanged agencies can
+skip the API for answers younger than the TTL.
+"""
+
+import json
+import time
+import hashlib
+from typing import Any, Optional
+
+DEFAULT_TTL = 30 * 86400  # thirty days
+
+def make_key(*parts) -> str:
+    """Return the cache key for a tool name and its prompt inputs"""
+    return hashlib.sha1('|'.join(str(part or '') for part in parts).encode('utf-8')).hexdigest()
+
+def ensure_table(conn):
+    """Create the ai_cache table if it doesn't exist"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ai_cache (
+            key TEXT PRIMARY KEY,
+            response TEXT,
+            ts INTEGER
+        )
+    ''')
+    conn.commit()
+
+def get(conn, key: str, ttl: int = DEFAULT_TTL) -> Optional[Any]:
+    """Return the cached response for a key, or None if missing or older than ttl seconds"""
+    row = conn.execute("SELECT response FROM ai_cache WHERE key = ? AND ts > ?",
+                       (key, int(time.time()) - ttl)).fetchone()
+    return json.loads(row[0]) if row else None
+
+def put(conn, key: str, data: Any):
+    """Store a response for a key"""
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO ai_cache (key, response, ts) VALUES (?, ?, ?)",
+                     (key, json.dumps(data), int(time.time())))
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+On-disk cache for Chrome audit results.
+
+Each audited URL is stored as .audit-cache/<sha1(url)>.json so repeated runs
+can skip the browser for sites audited within the TTL.
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+from typing import Dict, Optional
+
+CACHE_DIR = '.audit-cache'
+DEFAULT_TTL = 86400  # one day
+
+def _cache_path(url: str) -> str:
+    """Return the cache file path for a URL"""
+    return os.path.join(CACHE_DIR, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+
+def get(url: str, ttl: int = DEFAULT_TTL) -> Optional[Dict]:
+    """Return the cached audit for a URL, or None if missing or older than ttl seconds"""
+    path = _cache_path(url)
+    try:
+        if time.time() - os.path.getmtime(path) > ttl:
+            return None
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def put(url: str, data: Dict):
+    """Store an audit result for a URL, written atomically"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, _cache_path(url))
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+def clear():
+    """Remove all cached audit results"""
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Shared SQLite connection helper for the maintenance tools.
+
+Opens agencies.db in WAL mode with relaxed fsync and a larger page cache so
+long cleaning passes don't block readers and commits stay cheap.
+"""
+
+import sqlite3
+
+def connect_db(path='agencies.db', **kwargs):
+    """Open the agencies database with performance PRAGMAs applied (kwargs go to sqlite3.connect)"""
+    conn = sqlite3.connect(path, **kwargs)
+    conn.executescript('''
+        PRAGMA journal_mode = WAL;
+        PRAGMA synchronous = NORMAL;
+        PRAGMA temp_store = MEMORY;
+        PRAGMA cache_size = -65536;
+        PRAGMA mmap_size = 268435456;
+    ''')
+    return conn
+
+def ensure_status_index(conn):
+    """Create the index used by the website_status lookups of the validation tools"""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_agencies_status ON agencies(website_status, type)")
+
+def ensure_lookup_indexes(conn):
+    """Create the indexes used by the type and missing-website lookups of the AI and classification tools"""
+    conn.executescript('''
+        CREATE INDEX IF NOT EXISTS idx_agencies_type ON agencies(type);
+        CREATE INDEX IF NOT EXISTS idx_agencies_missing_website ON agencies(id)
+            WHERE website IS NULL OR website = '';
+    ''')
+
+def ensure_cleanup_indexes(conn):
+    """Create the indexes used by the cleanup tools' selection queries"""
+    # The partial indexes hold only agencies not yet cleaned, and agencies with
+    # no website, phone, address or description; SQLite uses them for any query
+    # whose WHERE repeats that condition exactly
+    conn.executescript('''
+        CREATE INDEX IF NOT EXISTS idx_agencies_cleanup ON agencies(cleanup_status);
+        CREATE INDEX IF NOT EXISTS idx_agencies_cleanup_pending ON agencies(id)
+            WHERE cleanup_status IS NOT 'cleaned';
+        CREATE INDEX IF NOT EXISTS idx_agencies_missing_info ON agencies(id)
+            WHERE (website IS NULL OR website = '')
+            AND (phone IS NULL OR phone = '')
+            AND (address IS NULL OR address = '')
+            AND (description IS NULL OR description = '');
+    ''')
+
+# Columns the website validator writes that older databases were created without
+WEBSITE_COLUMNS = ('alternative_urls', 'redirect_chain', 'security_warnings')
+
+def ensure_website_columns(conn):
+    """Add the website validation columns to agencies if they are missing"""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(agencies)")}
+    for column in WEBSITE_COLUMNS:
+        if column not in existing:
+            conn.execute(f"ALTER TABLE agencies ADD COLUMN {column} TEXT")
+    conn.commit()
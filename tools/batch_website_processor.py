@@ -18,6 +18,7 @@ from typing import List, Dict, Optional
 # Import our enhanced tools
 from enhanced_website_validator import EnhancedWebsiteValidator
 from website_discovery_ai import AIWebsiteDiscoverer
+from export_agencies import export_agencies_json
 
 # Configure logging
 logging.basicConfig(
@@ -32,6 +33,11 @@ class BatchWebsiteProcessor:
         self.processed_count = 0
         self.improved_count = 0
 
+    def close(self):
+        """Close the discoverer's cache connection and the validator's session"""
+        self.ai_discoverer.close()
+        self.validator.close()
+
     def process_missing_websites(self, limit: int = 50) -> int:
         """Find websites for agencies that have none"""
         logging.info(f"🔍 Finding websites for agencies with missing URLs (limit: {limit})")
@@ -49,9 +55,9 @@ class BatchWebsiteProcessor:
         ''', (limit,))
 
         agencies = cursor.fetchall()
-        conn.close()
 
         if not agencies:
+            conn.close()
             logging.info("✅ No agencies found with missing websites")
             return 0
 
@@ -67,7 +73,8 @@ class BatchWebsiteProcessor:
             if discovered_websites:
                 # Use the AI discovery update function
                 from website_discovery_ai import update_agency_with_discovered_website
-                if update_agency_with_discovered_website(agency_id, discovered_websites):
+                if update_agency_with_discovered_website(agency_id, discovered_websites, conn):
+                    conn.commit()
                     improved += 1
                     logging.info(f"  ✅ Found website for {name}: {discovered_websites[0]['url']}")
                 else:
@@ -78,6 +85,8 @@ class BatchWebsiteProcessor:
             # Rate limiting
             time.sleep(2)
 
+        conn.close()
+
         logging.info(f"🤖 AI discovery complete: {improved}/{len(agencies)} agencies got websites")
         return improved
 
@@ -230,20 +239,22 @@ def main():
     """Main function to run batch website processing"""
     processor = BatchWebsiteProcessor()
 
-    # Run comprehensive processing with reasonable limits
-    results = processor.run_comprehensive_processing(
-        missing_limit=25,  # Process 25 missing websites
-        broken_limit=50    # Process 50 broken websites
-    )
+    try:
+        # Run comprehensive processing with reasonable limits
+        results = processor.run_comprehensive_processing(
+            missing_limit=25,  # Process 25 missing websites
+            broken_limit=50    # Process 50 broken websites
+        )
+    finally:
+        processor.close()
 
     # Update web interface data
     print("\n📤 Updating web interface data...")
-    import subprocess
-    result = subprocess.run(['bash', 'tools/update_data.sh'],
-                          capture_output=True, text=True)
-    if result.returncode == 0:
+    try:
+        export_agencies_json()
         print("✅ Web interface data updated")
-    else:
+    except Exception as e:
+        logging.error(f"Error exporting web interface data: {e}")
         print("⚠️ Web interface update had issues")
 
 if __name__ == '__main__':
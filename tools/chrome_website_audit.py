@@ -10,11 +10,17 @@ Uses Chrome DevTools MCP server to perform advanced website validation including
 - Real browser environment testing
 """
 
+import asyncio
 import sqlite3
 import logging
+import threading
 import time
 import json
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import _audit_cache
+from _db import connect_db
 
 # Configure logging
 logging.basicConfig(
@@ -22,17 +28,51 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+# Audits are network/page-load bound, so run several tabs at once and only
+# space out requests that hit the same host
+CHROME_AUDIT_CONCURRENCY = 8
+PER_HOST_DELAY = 2  # seconds between audits of the same host
+AUDIT_BATCH_LIMIT = 5  # Limit for testing
+
+# Log a progress line every PROGRESS_EVERY audits; per-row lines need --verbose
+PROGRESS_EVERY = 1000
+
 class ChromeWebsiteAuditor:
-    def __init__(self):
+    def __init__(self, use_cache: bool = True):
+        self.use_cache = use_cache
         self.chrome_available = False
         # This will be populated when Chrome DevTools MCP is connected
         self.chrome_tools = None
+        # One browser session shared by every audit; each audit only opens and
+        # closes its own page/context on it
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    def _get_session(self):
+        """Return the shared browser session, starting it on first use"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    # With MCP connected this is where the browser is launched once
+                    self._session = self.chrome_tools
+        return self._session
+
+    def close(self):
+        """Shut down the shared browser session"""
+        with self._session_lock:
+            # With MCP connected this is where the browser is closed
+            self._session = None
 
     def audit_website_chrome(self, url: str) -> Dict:
         """
         Perform comprehensive Chrome DevTools audit of a website
         Returns detailed audit results
         """
+        if self.use_cache:
+            cached = _audit_cache.get(url)
+            if cached is not None:
+                return cached
+
         if not self.chrome_available or not self.chrome_tools:
             return {
                 'chrome_validated': False,
@@ -56,24 +96,31 @@ class ChromeWebsiteAuditor:
         }
 
         try:
-            # Use Chrome DevTools MCP tools
+            # Use Chrome DevTools MCP tools on the shared session
             # Note: These would be actual MCP tool calls when connected
+            session = self._get_session()
+
+            # 0. Open a fresh page on the shared browser (closed again below)
+            # page = session.new_page()
 
             # 1. Navigate to page and capture network
-            # navigate_result = self.chrome_tools.navigate_page(url=url, timeout=30000)
+            # navigate_result = session.navigate_page(url=url, timeout=30000)
 
             # 2. Run security audit
-            # security_audit = self.chrome_tools.run_audit_mode()
+            # security_audit = session.run_audit_mode()
 
             # 3. Run performance audit
-            # perf_audit = self.chrome_tools.run_performance_audit()
+            # perf_audit = session.run_performance_audit()
 
             # 4. Check for console errors
-            # console_logs = self.chrome_tools.get_console_logs()
-            # console_errors = self.chrome_tools.get_console_errors()
+            # console_logs = session.get_console_logs()
+            # console_errors = session.get_console_errors()
 
             # 5. Capture screenshot for verification
-            # screenshot = self.chrome_tools.take_screenshot()
+            # screenshot = session.take_screenshot()
+
+            # 6. Close only the page, the browser stays up for the next audit
+            # session.close_page(page)
 
             # For now, return placeholder structure
             audit_results.update({
@@ -91,6 +138,9 @@ class ChromeWebsiteAuditor:
             audit_results['error'] = str(e)
             logging.error(f"Chrome audit failed for {url}: {e}")
 
+        if self.use_cache and 'error' not in audit_results:
+            _audit_cache.put(url, audit_results)
+
         return audit_results
 
     def validate_with_chrome_devtools(self, url: str) -> Dict:
@@ -98,7 +148,7 @@ class ChromeWebsiteAuditor:
         Main validation method using Chrome DevTools
         This is called by the enhanced validator when Chrome is enabled
         """
-        logging.info(f"Running Chrome DevTools audit for: {url}")
+        logging.debug(f"Running Chrome DevTools audit for: {url}")
 
         # Basic Chrome navigation test
         chrome_result = self.audit_website_chrome(url)
@@ -129,6 +179,45 @@ class ChromeWebsiteAuditor:
 
         return validation_result
 
+    async def validate_with_chrome_devtools_async(self, url: str) -> Dict:
+        """Run validate_with_chrome_devtools in a worker thread so audits can overlap"""
+        return await asyncio.to_thread(self.validate_with_chrome_devtools, url)
+
+async def audit_agencies_concurrently(auditor: ChromeWebsiteAuditor, agencies: Iterable[Tuple],
+                                      concurrency: int = CHROME_AUDIT_CONCURRENCY) -> List[Tuple]:
+    """Audit (id, name, website) rows with a bounded worker pool, returns (id, name, audit) tuples"""
+    semaphore = asyncio.Semaphore(concurrency)
+    host_locks = {}
+    host_last_start = {}
+    completed = 0
+
+    async def wait_for_host(host):
+        # Serialize starts per host and keep PER_HOST_DELAY between them
+        lock = host_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            delay = host_last_start.get(host, 0) + PER_HOST_DELAY - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            host_last_start[host] = time.monotonic()
+
+    async def worker(agency_id, name, website):
+        # Cached audits never touch the browser, so skip the host delay and pool slot
+        if auditor.use_cache and _audit_cache.get(website) is not None:
+            return agency_id, name, auditor.validate_with_chrome_devtools(website)
+
+        await wait_for_host(urlsplit(website).hostname or website)
+        async with semaphore:
+            logging.debug(f"Chrome auditing: {name} - {website}")
+            result = await auditor.validate_with_chrome_devtools_async(website)
+
+        nonlocal completed
+        completed += 1
+        if completed % PROGRESS_EVERY == 0:
+            logging.info("Chrome audited %d agencies so far", completed)
+        return agency_id, name, result
+
+    return await asyncio.gather(*(worker(*agency) for agency in agencies))
+
 def integrate_chrome_audit_into_validator():
     """
     Integration function to add Chrome audit to the enhanced validator
@@ -151,45 +240,79 @@ def integrate_chrome_audit_into_validator():
     except Exception as e:
         logging.error(f"Failed to initialize Chrome DevTools integration: {e}")
 
-def update_agency_chrome_audit(agency_id: int, chrome_audit: Dict):
-    """Update agency record with Chrome DevTools audit results"""
+def ensure_chrome_audit_schema(conn):
+    """Add the chrome_audited_at column and the audit lookup indexes if missing"""
     try:
-        conn = sqlite3.connect('agencies.db')
-        cursor = conn.cursor()
-
-        # Update Chrome audit data
-        cursor.execute('''
-            UPDATE agencies
-            SET chrome_validated = ?,
-                security_warnings = ?,
-                performance_score = ?,
-                accessibility_score = ?,
-                seo_score = ?,
-                additional_info = additional_info || ?
-            WHERE id = ?
-        ''', (
+        conn.execute("ALTER TABLE agencies ADD COLUMN chrome_audited_at TEXT")
+        conn.commit()
+    except sqlite3.OperationalError:
+        pass  # Column already exists
+
+    # The partial index only holds rows still waiting for an audit, so reruns
+    # don't scan agencies that were already audited
+    conn.executescript('''
+        CREATE INDEX IF NOT EXISTS idx_agencies_audit
+            ON agencies(chrome_validated, type, website);
+        CREATE INDEX IF NOT EXISTS idx_agencies_needs_audit
+            ON agencies(id)
+            WHERE website IS NOT NULL AND website != ''
+            AND (chrome_validated IS NULL OR chrome_validated = 0)
+            AND type != 'undefined';
+    ''')
+
+def update_agency_chrome_audits(conn, audits: Iterable[Tuple[int, Dict]]) -> int:
+    """Persist (agency_id, chrome_audit) results in one transaction, returns the number of rows written"""
+    # Generator so executemany binds one row at a time instead of a full list
+    rows = (
+        (
             chrome_audit.get('chrome_validated', False),
             json.dumps(chrome_audit.get('security_warnings', [])),
             chrome_audit.get('performance_score'),
             chrome_audit.get('accessibility_score'),
             chrome_audit.get('seo_score'),
-            f" | Chrome audit completed on {time.strftime('%Y-%m-%d %H:%M:%S')}",
             agency_id
-        ))
+        )
+        for agency_id, chrome_audit in audits
+    )
 
-        conn.commit()
-        conn.close()
-        return True
+    try:
+        with conn:
+            cursor = conn.executemany('''
+                UPDATE agencies
+                SET chrome_validated = ?,
+                    security_warnings = ?,
+                    performance_score = ?,
+                    accessibility_score = ?,
+                    seo_score = ?,
+                    chrome_audited_at = datetime('now')
+                WHERE id = ?
+            ''', rows)
+        return cursor.rowcount
 
     except Exception as e:
         logging.error(f"Error updating agency Chrome audit data: {e}")
-        return False
+        return 0
 
 def main():
     """Main function to run Chrome DevTools website audit"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run Chrome DevTools audits for agency websites')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore and do not write cached audit results')
+    parser.add_argument('--clear-cache', action='store_true', help='Delete cached audit results before running')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Log every audited agency')
+
+    args = parser.parse_args()
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
     logging.info("Starting Chrome DevTools website audit...")
 
-    auditor = ChromeWebsiteAuditor()
+    if args.clear_cache:
+        _audit_cache.clear()
+        logging.info("Cleared Chrome audit cache")
+
+    auditor = ChromeWebsiteAuditor(use_cache=not args.no_cache)
 
     # Check if Chrome DevTools is available
     if not auditor.chrome_available:
@@ -199,43 +322,46 @@ def main():
         return
 
     try:
-        conn = sqlite3.connect('agencies.db')
+        conn = connect_db()
+        ensure_chrome_audit_schema(conn)
         cursor = conn.cursor()
+        cursor.arraysize = 1000
 
-        # Get agencies that need Chrome audit (have websites but no Chrome validation)
-        cursor.execute('''
-            SELECT id, name, website
+        # Agencies that need Chrome audit (have websites but no Chrome validation)
+        needs_audit = '''
             FROM agencies
             WHERE website IS NOT NULL AND website != ''
             AND (chrome_validated IS NULL OR chrome_validated = 0)
             AND type != 'undefined'
-            ORDER BY id
-        ''')
+        '''
 
-        agencies = cursor.fetchall()
-        conn.close()
+        cursor.execute(f"SELECT COUNT(*) {needs_audit}")
+        total_count = cursor.fetchone()[0]
 
-        if not agencies:
+        if not total_count:
             print("✅ No agencies found needing Chrome audit")
+            conn.close()
             return
 
-        logging.info(f"Found {len(agencies)} agencies for Chrome audit")
-
-        audited_count = 0
+        logging.info(f"Found {total_count} agencies for Chrome audit")
 
-        for agency_id, name, website in agencies[:5]:  # Limit for testing
-            logging.info(f"Chrome auditing: {name} - {website}")
+        # Only pull the rows this run will audit instead of the whole backlog
+        cursor.execute(f"SELECT id, name, website {needs_audit} ORDER BY id LIMIT ?", (AUDIT_BATCH_LIMIT,))
+        audits = asyncio.run(audit_agencies_concurrently(auditor, cursor))
 
-            chrome_audit = auditor.validate_with_chrome_devtools(website)
+        audited_count = update_agency_chrome_audits(
+            conn, ((agency_id, chrome_audit) for agency_id, _, chrome_audit in audits)
+        )
 
-            if update_agency_chrome_audit(agency_id, chrome_audit):
-                audited_count += 1
-                logging.info(f"  ✅ Chrome audit completed for {name}")
-            else:
-                logging.error(f"  ❌ Failed to update Chrome audit for {name}")
+        if audited_count:
+            for _, name, _ in audits:
+                logging.debug(f"  ✅ Chrome audit completed for {name}")
+        else:
+            logging.error("  ❌ Failed to update Chrome audit results")
 
-            # Rate limiting
-            time.sleep(2)
+        # Refresh planner statistics after the bulk update
+        conn.execute("ANALYZE agencies")
+        conn.close()
 
         logging.info(f"Chrome audit complete: {audited_count} agencies audited")
 
@@ -247,5 +373,8 @@ def main():
         logging.error(f"Error during Chrome audit: {e}")
         print(f"❌ Error: {e}")
 
+    finally:
+        auditor.close()
+
 if __name__ == '__main__':
     main()
@@ -3,94 +3,115 @@
 Script to clean up agency names by removing numbering prefixes like "1. " or "2. "
 """
 
-import sqlite3
 import re
 import logging
 
+from _db import connect_db, ensure_cleanup_indexes
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+
+# Log a progress line every PROGRESS_EVERY rows; per-row lines need --verbose
+PROGRESS_EVERY = 1000
+
+# Cleaning patterns, compiled once at import and fused so each name is scanned
+# a handful of times instead of once per rule
+# Leading numbering ('1. '), quotes and letter prefixes ('a) '), possibly stacked
+_PREFIX = re.compile(r'^\s*(?:\d+\.|"|[a-zA-Z]\))\s*')
+# Whole-line junk like "A real estate agency *...*" left over from Gemini output
+_JUNK_LINE = re.compile(r'^(?:A real estate agency \*.*|Agencies Specializing \*.*\*.*)$', re.IGNORECASE)
+# "'Discovered' Oct 12" date stamps
+_DISCOVERED = re.compile(r"'Discovered'\s*[A-Za-z]{3}\s*\d+", re.IGNORECASE)
+# Markdown bold/italic wrappers
+_MARKDOWN = re.compile(r'\*{1,2}([^*]+)\*{1,2}')
+
 def clean_name_prefix(name):
     """Remove various problematic prefixes and formatting from agency names"""
     if not name:
         return name
 
-    # Apply multiple cleaning patterns in sequence
-    patterns = [
-        # Remove numbering prefixes like '1. ', '2. ', etc.
-        (r'^\s*\d+\.\s*', ''),
-        # Remove leading quotes
-        (r'^"', ''),
-        # Remove "A real estate agency *" patterns and similar
-        (r'^A real estate agency \*.*$', ''),
-        (r'^Agencies Specializing \*.*\*.*$', ''),
-        # Remove letter prefixes like a) b) c)
-        (r'^[a-zA-Z]\)\s*', ''),
-        # Remove "Discovered" date patterns
-        (r"'Discovered'\s*Oct\s*\d+", ''),
-        (r"'Discovered'\s*[A-Za-z]{3}\s*\d+", ''),
-        # Remove markdown bold formatting
-        (r'\*\*([^*]+)\*\*', r'\1'),
-        # Remove markdown italic formatting
-        (r'\*([^*]+)\*', r'\1'),
-        # Remove any remaining asterisks at start/end
-        (r'^\*+|\*+$', ''),
-    ]
-
-    cleaned_name = name
-    for pattern, replacement in patterns:
-        cleaned_name = re.sub(pattern, replacement, cleaned_name, flags=re.IGNORECASE)
-
-    return cleaned_name.strip()
-
-def main():
-    """Main function to clean agency names"""
+    # Strip stacked prefixes until the name stops changing
+    while True:
+        stripped = _PREFIX.sub('', name)
+        if stripped == name:
+            break
+        name = stripped
+
+    if _JUNK_LINE.match(name):
+        return ''
+
+    if "'" in name:
+        name = _DISCOVERED.sub('', name)
+    if '*' in name:
+        name = _MARKDOWN.sub(r'\1', name).strip('*')
+
+    return name.strip()
+
+def main(conn=None, verbose=False):
+    """Main function to clean agency names (verbose logs every changed row)"""
     logging.info("Starting name cleaning for agencies...")
 
     try:
-        conn = sqlite3.connect('agencies.db')
+        own_conn = conn is None
+        if own_conn:
+            conn = connect_db()
         cursor = conn.cursor()
+        cursor.arraysize = 1000
+        ensure_cleanup_indexes(conn)
 
-        # Get agencies that need name cleaning (pending or not yet processed)
+        # Mark names that clean_name_prefix would leave untouched directly in SQL:
+        # starts with a letter (no numbering/quote/"a)" prefix), ends with a plain
+        # character, and contains no markdown or 'Discovered' stamps
         cursor.execute('''
-            SELECT id, name
-            FROM agencies
-            WHERE cleanup_status != 'cleaned' OR cleanup_status IS NULL
-            ORDER BY id
+            UPDATE agencies
+            SET cleanup_status = 'cleaned'
+            WHERE cleanup_status IS NOT 'cleaned'
+            AND name GLOB '[A-Za-z]*'
+            AND name NOT GLOB '?)*'
+            AND name GLOB '*[A-Za-z0-9.)]'
+            AND name NOT LIKE '%*%'
+            AND name NOT LIKE '%''Discovered''%'
         ''')
-
-        agencies = cursor.fetchall()
-        logging.info(f"Found {len(agencies)} agencies to check for cleaning")
-
-        updated_count = 0
-
-        for agency_id, name in agencies:
-            cleaned_name = clean_name_prefix(name)
-
-            if cleaned_name != name:
-                logging.info(f"Cleaning '{name}' -> '{cleaned_name}'")
-
-                # Update the database
-                cursor.execute('''
-                    UPDATE agencies
-                    SET name = ?, cleanup_status = 'cleaned'
-                    WHERE id = ?
-                ''', (cleaned_name, agency_id))
-
+        prefiltered_count = cursor.rowcount
+        conn.commit()
+        logging.info(f"Marked {prefiltered_count} already clean names in SQL")
+
+        # Clean the remaining names inside SQLite via a Python UDF, so rows are
+        # transformed in one scan instead of a SELECT/UPDATE round-trip each
+        conn.create_function("clean_name", 1, clean_name_prefix, deterministic=True)
+
+        with conn:
+            cursor.execute('''
+                UPDATE agencies
+                SET name = clean_name(name), cleanup_status = 'cleaned'
+                WHERE cleanup_status IS NOT 'cleaned'
+                AND clean_name(name) IS NOT name
+                RETURNING name
+            ''')
+            # Stream the RETURNING rows instead of materializing them
+            updated_count = 0
+            for (cleaned_name,) in cursor:
+                if verbose:
+                    logging.info(f"Cleaned name -> '{cleaned_name}'")
                 updated_count += 1
-            else:
-                # Mark as cleaned even if no change was needed
-                cursor.execute('''
-                    UPDATE agencies
-                    SET cleanup_status = 'cleaned'
-                    WHERE id = ?
-                ''', (agency_id,))
+                if updated_count % PROGRESS_EVERY == 0:
+                    logging.info("Cleaned %d names so far", updated_count)
 
-        conn.commit()
-        conn.close()
+            # Mark as cleaned even if no change was needed
+            cursor.execute('''
+                UPDATE agencies
+                SET cleanup_status = 'cleaned'
+                WHERE cleanup_status IS NOT 'cleaned'
+            ''')
+
+        # Refresh planner statistics after the bulk update
+        cursor.execute("ANALYZE agencies")
+        if own_conn:
+            conn.close()
 
         logging.info(f"Successfully cleaned {updated_count} agency names")
 
@@ -98,4 +119,10 @@ def main():
         logging.error(f"Error during name cleaning: {e}")
 
 if __name__ == '__main__':
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Clean numbering and markdown from agency names')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Log every changed row')
+
+    args = parser.parse_args()
+    main(verbose=args.verbose)
@@ -4,10 +4,11 @@ Script to clean up malformed website URLs in the agencies database.
 Handles issues like trailing punctuation, markdown link syntax, and other URL formatting problems.
 """
 
-import sqlite3
 import re
 import logging
-from urllib.parse import urlparse
+from urllib.parse import urlsplit
+
+from _db import connect_db
 
 # Configure logging
 logging.basicConfig(
@@ -15,12 +16,23 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+
+# Log a progress line every PROGRESS_EVERY rows; per-row lines need --verbose
+PROGRESS_EVERY = 1000
+
+# URL cleanup patterns, compiled once at import
+_MD_LINK = re.compile(r'\[([^\]]*)\]\(([^)]+)\)')
+_MD_CORRUPT = re.compile(r'\]\(([^)]+)\)')
+_TRAIL = re.compile(r'[.,;:\]\)\s]+$')
+_LEAD = re.compile(r'^[\[\(\s]+')
+_DOMAIN = re.compile(r'^[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+
 def is_valid_url(url):
     """Check if URL is properly formatted"""
     if not url:
         return False
     try:
-        result = urlparse(url)
+        result = urlsplit(url)
         return all([result.scheme, result.netloc])
     except:
         return False
@@ -32,21 +44,29 @@ def clean_website_url(url):
 
     original_url = url.strip()
 
+    # Fast path: an absolute URL with no markdown and no trailing punctuation
+    # comes out of the cleanup below unchanged, so skip the regex passes
+    if (original_url.startswith(('http://', 'https://'))
+            and ']' not in original_url
+            and original_url[-1] not in '.,;:)'):
+        return original_url
+
+    # Fallback for markdown links, bare domains and stray punctuation
     # Handle markdown-style links: [text](url) -> url
-    markdown_match = re.search(r'\[([^\]]*)\]\(([^)]+)\)', original_url)
+    markdown_match = _MD_LINK.search(original_url)
     if markdown_match:
         url = markdown_match.group(2)
     else:
         # Handle corrupted markdown: text](url) -> url
-        corrupted_markdown = re.search(r'\]\(([^)]+)\)', original_url)
+        corrupted_markdown = _MD_CORRUPT.search(original_url)
         if corrupted_markdown:
             url = corrupted_markdown.group(1)
 
     # Remove trailing punctuation and brackets
-    url = re.sub(r'[.,;:\]\)\s]+$', '', url)
+    url = _TRAIL.sub('', url)
 
     # Remove any leading brackets or punctuation
-    url = re.sub(r'^[\[\(\s]+', '', url)
+    url = _LEAD.sub('', url)
 
     # Fix common URL issues
     url = url.strip()
@@ -54,7 +74,7 @@ def clean_website_url(url):
     # If URL doesn't have a scheme, add https://
     if url and not url.startswith(('http://', 'https://')):
         # Check if it looks like a domain
-        if re.match(r'^[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', url):
+        if _DOMAIN.match(url):
             # If it starts with www., add https://
             if url.startswith('www.'):
                 url = f"https://{url}"
@@ -69,44 +89,51 @@ def clean_website_url(url):
         # If cleaning made it invalid, return the original for manual review
         return original_url
 
-def main():
-    """Main function to clean website URLs"""
+def main(conn=None, verbose=False):
+    """Main function to clean website URLs (verbose logs every changed row)"""
     logging.info("Starting website URL cleanup...")
 
     try:
-        conn = sqlite3.connect('agencies.db')
+        own_conn = conn is None
+        if own_conn:
+            conn = connect_db()
         cursor = conn.cursor()
-
-        # Get all agencies with website data
-        cursor.execute('''
-            SELECT id, name, website
-            FROM agencies
-            WHERE website IS NOT NULL AND website != ''
-            ORDER BY id
-        ''')
-
-        agencies_to_check = cursor.fetchall()
-        logging.info(f"Found {len(agencies_to_check)} agencies with website data to check")
-
-        cleaned_count = 0
-        skipped_count = 0
-
-        for agency_id, name, website in agencies_to_check:
-            cleaned_url = clean_website_url(website)
-
-            if cleaned_url != website:
-                logging.info(f"Cleaned URL for '{name}': '{website}' -> '{cleaned_url}'")
-                cursor.execute('''
-                    UPDATE agencies
-                    SET website = ?
-                    WHERE id = ?
-                ''', (cleaned_url, agency_id))
+        cursor.arraysize = 1000
+
+        cursor.execute("SELECT COUNT(*) FROM agencies WHERE website IS NOT NULL AND website != ''")
+        total_count = cursor.fetchone()[0]
+
+        # Clean URLs inside SQLite via a Python UDF in a single UPDATE, skipping
+        # URLs clean_website_url would leave untouched (explicit scheme, no
+        # markdown, no trailing punctuation)
+        conn.create_function("clean_url", 1, clean_website_url, deterministic=True)
+
+        with conn:
+            cursor.execute('''
+                UPDATE agencies
+                SET website = clean_url(website)
+                WHERE website IS NOT NULL AND website != ''
+                AND NOT (
+                    (website GLOB 'http://*' OR website GLOB 'https://*')
+                    AND website NOT LIKE '%]%'
+                    AND website GLOB '*[A-Za-z0-9/]'
+                )
+                AND clean_url(website) IS NOT website
+                RETURNING name, website
+            ''')
+
+            # Stream the RETURNING rows instead of materializing them
+            cleaned_count = 0
+            for name, cleaned_url in cursor:
+                if verbose:
+                    logging.info(f"Cleaned URL for '{name}': -> '{cleaned_url}'")
                 cleaned_count += 1
-            else:
-                skipped_count += 1
+                if cleaned_count % PROGRESS_EVERY == 0:
+                    logging.info("Cleaned %d/%d URLs so far", cleaned_count, total_count)
+        if own_conn:
+            conn.close()
 
-        conn.commit()
-        conn.close()
+        skipped_count = total_count - cleaned_count
 
         logging.info(f"URL cleanup complete: {cleaned_count} URLs cleaned, {skipped_count} URLs unchanged")
 
@@ -120,4 +147,10 @@ def main():
         print(f"❌ Error during cleanup: {e}")
 
 if __name__ == '__main__':
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Clean malformed website URLs')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Log every changed row')
+
+    args = parser.parse_args()
+    main(verbose=args.verbose)
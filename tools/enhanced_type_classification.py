@@ -7,206 +7,218 @@ Enhanced script to classify agencies based on multiple indicators:
 - Description keywords
 """
 
-import sqlite3
 import re
 import logging
 
+from _db import connect_db
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-def analyze_phone_number(phone):
-    """Analyze phone number for country indicators"""
-    if not phone:
-        return None
 
-    phone_str = str(phone).strip()
+# Log a progress line every PROGRESS_EVERY rows; per-row lines need --verbose
+PROGRESS_EVERY = 1000
+
+def analyze_phone_number(phone_lower):
+    """Analyze a stripped, lowercased phone number for country indicators"""
+    if not phone_lower:
+        return None
 
     # Polish indicators
-    if phone_str.startswith('+48') or phone_str.startswith('48'):
+    if phone_lower.startswith(('+48', '48')):
         return 'polish'
-    if 'poland' in phone_str.lower() or 'polska' in phone_str.lower():
+    if 'poland' in phone_lower or 'polska' in phone_lower:
         return 'polish'
 
     # Spanish indicators
-    if phone_str.startswith('+34') or phone_str.startswith('34'):
+    if phone_lower.startswith(('+34', '34')):
         return 'spain'
-    if 'spain' in phone_str.lower() or 'españa' in phone_str.lower():
+    if 'spain' in phone_lower or 'españa' in phone_lower:
         return 'spain'
 
     return None
 
-def analyze_website_domain(website):
-    """Analyze website domain for location indicators"""
-    if not website:
+# Location keywords per field
+POLISH_WEB_TERMS = ['.pl', 'poland', 'polska']
+SPANISH_WEB_TERMS = [
+    '.es', 'spain', 'españa',
+    # Costa del Sol / Marbella specific
+    'marbella', 'costadelsol', 'costa-del-sol', 'malaga', 'andalusia'
+]
+
+POLISH_CITIES = [
+    'warsaw', 'krakow', 'lodz', 'wroclaw', 'poznan', 'gdansk', 'szczecin',
+    'bydgoszcz', 'lublin', 'katowice', 'bialystok', 'gdynia', 'czestochowa',
+    'radom', 'sosnowiec', 'torun', 'kielce', 'rzeszow', 'gliwice', 'zabrze',
+    'olsztyn', 'bielsko-biala', 'bytom', 'zielona gora', 'rybnik', 'ruda slaska',
+    'opole', 'tichy', 'gorzow wielkopolski', 'dabrowa gornicza', 'plock',
+    'elblag', 'walbrzych', 'tarnow', 'chorzow', 'kalisz', 'legnica', 'grudziadz',
+    'slupsk', 'jastrzebie-zdroj', 'nowy sacz', 'jaworzno', 'jelenia gora',
+    'ostrow mazowiecka', 'swidnica', 'stalowa wola', 'piekary slaskie',
+    'lubin', 'zamosc', 'poland', 'polska'
+]
+SPANISH_LOCATIONS = [
+    'marbella', 'malaga', 'andalusia', 'costa del sol', 'costa blanca',
+    'alicante', 'valencia', 'barcelona', 'madrid', 'spain', 'españa',
+    'puerto banus', 'estepona', 'san pedro', 'fuengirola', 'torremolinos'
+]
+
+POLISH_KEYWORDS = [
+    'poland', 'polska', 'polish', 'polski', 'warszawa', 'kraków', 'łódź',
+    'wrocław', 'poznań', 'gdańsk', 'szczecin', 'polacy', 'polak', 'polka'
+]
+SPANISH_KEYWORDS = [
+    'spain', 'españa', 'spanish', 'marbella', 'costa del sol', 'andalusia',
+    'malaga', 'puerto banus', 'español', 'española', 'hiszpania'
+]
+
+POLISH_NAME_TERMS = ['polska', 'polish', 'nieruchomości']
+SPANISH_NAME_TERMS = ['marbella', 'spain', 'inmobiliaria', 'costa']
+
+def _compile_terms(terms):
+    """Compile a keyword list into one alternation regex (substring semantics)"""
+    return re.compile('|'.join(map(re.escape, terms)))
+
+# One compiled alternation per keyword list, so each field is scanned once
+# instead of once per keyword
+_POLISH_WEB = _compile_terms(POLISH_WEB_TERMS)
+_SPAIN_WEB = _compile_terms(SPANISH_WEB_TERMS)
+_POLISH_DESC = _compile_terms(POLISH_KEYWORDS)
+_SPAIN_DESC = _compile_terms(SPANISH_KEYWORDS)
+_POLISH_NAME = _compile_terms(POLISH_NAME_TERMS)
+_SPAIN_NAME = _compile_terms(SPANISH_NAME_TERMS)
+
+# Addresses are matched on whole words so e.g. 'lubin' doesn't fire inside
+# 'lublin'; these separators count as word boundaries
+ADDRESS_SEPARATORS = ',.;:/()-\'"&\t\n\r'
+_ADDRESS_SEPARATOR_TABLE = str.maketrans(ADDRESS_SEPARATORS, ' ' * len(ADDRESS_SEPARATORS))
+
+def _normalize_address(text):
+    """Replace address separators with spaces and pad, so words are delimited by ' '"""
+    return ' ' + text.translate(_ADDRESS_SEPARATOR_TABLE) + ' '
+
+def _split_address_terms(terms):
+    """Split keywords into a frozenset of single words and a regex for multi-word phrases"""
+    normalized = [term.translate(_ADDRESS_SEPARATOR_TABLE) for term in terms]
+    words = frozenset(term for term in normalized if ' ' not in term)
+    phrases = [term for term in normalized if ' ' in term]
+    phrase_pattern = '|'.join(' ' + re.escape(phrase) + ' ' for phrase in phrases) or '(?!)'
+    return words, re.compile(phrase_pattern)
+
+_POLISH_ADDR_WORDS, _POLISH_ADDR_PHRASES = _split_address_terms(POLISH_CITIES)
+_SPAIN_ADDR_WORDS, _SPAIN_ADDR_PHRASES = _split_address_terms(SPANISH_LOCATIONS)
+
+def analyze_website_domain(website_lower):
+    """Analyze a lowercased website domain for location indicators"""
+    if not website_lower:
         return None
 
-    website_lower = website.lower()
-
-    # Polish domains
-    if '.pl' in website_lower or 'poland' in website_lower or 'polska' in website_lower:
+    if _POLISH_WEB.search(website_lower):
         return 'polish'
-
-    # Spanish domains
-    if '.es' in website_lower or 'spain' in website_lower or 'españa' in website_lower:
-        return 'spain'
-
-    # Costa del Sol / Marbella specific
-    if any(term in website_lower for term in ['marbella', 'costadelsol', 'costa-del-sol', 'malaga', 'andalusia']):
+    if _SPAIN_WEB.search(website_lower):
         return 'spain'
 
     return None
 
-def analyze_address(address):
-    """Analyze address for location indicators"""
-    if not address:
+def analyze_address(address_lower):
+    """Analyze a lowercased address for location indicators"""
+    if not address_lower:
         return None
 
-    address_lower = address.lower()
-
-    # Polish cities
-    polish_cities = [
-        'warsaw', 'krakow', 'lodz', 'wroclaw', 'poznan', 'gdansk', 'szczecin',
-        'bydgoszcz', 'lublin', 'katowice', 'bialystok', 'gdynia', 'czestochowa',
-        'radom', 'sosnowiec', 'torun', 'kielce', 'rzeszow', 'gliwice', 'zabrze',
-        'olsztyn', 'bielsko-biala', 'bytom', 'zielona gora', 'rybnik', 'ruda slaska',
-        'opole', 'tichy', 'gorzow wielkopolski', 'dabrowa gornicza', 'plock',
-        'elblag', 'walbrzych', 'tarnow', 'chorzow', 'kalisz', 'legnica', 'grudziadz',
-        'slupsk', 'jastrzebie-zdroj', 'nowy sacz', 'jaworzno', 'jelenia gora',
-        'ostrow mazowiecka', 'swidnica', 'stalowa wola', 'piekary slaskie',
-        'lubin', 'zamosc', 'poland', 'polska'
-    ]
-
-    if any(city in address_lower for city in polish_cities):
-        return 'polish'
+    padded = _normalize_address(address_lower)
+    tokens = set(padded.split(' '))
 
-    # Spanish locations
-    spanish_locations = [
-        'marbella', 'malaga', 'andalusia', 'costa del sol', 'costa blanca',
-        'alicante', 'valencia', 'barcelona', 'madrid', 'spain', 'españa',
-        'puerto banus', 'estepona', 'san pedro', 'fuengirola', 'torremolinos'
-    ]
-
-    if any(location in address_lower for location in spanish_locations):
+    if tokens & _POLISH_ADDR_WORDS or _POLISH_ADDR_PHRASES.search(padded):
+        return 'polish'
+    if tokens & _SPAIN_ADDR_WORDS or _SPAIN_ADDR_PHRASES.search(padded):
         return 'spain'
 
     return None
 
-def analyze_description(description):
-    """Analyze description for location indicators"""
-    if not description:
+def analyze_description(desc_lower):
+    """Analyze a lowercased description for location indicators"""
+    if not desc_lower:
         return None
 
-    desc_lower = description.lower()
-
-    # Polish indicators
-    polish_keywords = [
-        'poland', 'polska', 'polish', 'polski', 'warszawa', 'kraków', 'łódź',
-        'wrocław', 'poznań', 'gdańsk', 'szczecin', 'polacy', 'polak', 'polka'
-    ]
-
-    if any(keyword in desc_lower for keyword in polish_keywords):
+    if _POLISH_DESC.search(desc_lower):
         return 'polish'
-
-    # Spanish/Marbella indicators
-    spanish_keywords = [
-        'spain', 'españa', 'spanish', 'marbella', 'costa del sol', 'andalusia',
-        'malaga', 'puerto banus', 'español', 'española', 'hiszpania'
-    ]
-
-    if any(keyword in desc_lower for keyword in spanish_keywords):
+    if _SPAIN_DESC.search(desc_lower):
         return 'spain'
 
     return None
 
 def determine_enhanced_type(name, website, phone, address, description, current_type):
     """Determine agency type using multiple indicators"""
-    indicators = {'polish': 0, 'spain': 0}
+    # Lowercase every field once and share it across the analyzers
+    name_lower = name.lower() if name else ''
+    website_lower = website.lower() if website else ''
+    phone_lower = str(phone).strip().lower() if phone else ''
+    address_lower = address.lower() if address else ''
+    desc_lower = description.lower() if description else ''
 
     # Analyze each field
-    phone_result = analyze_phone_number(phone)
-    if phone_result:
-        indicators[phone_result] += 2  # Phone is strong indicator
-
-    website_result = analyze_website_domain(website)
-    if website_result:
-        indicators[website_result] += 2  # Website is strong indicator
-
-    address_result = analyze_address(address)
-    if address_result:
-        indicators[address_result] += 1
-
-    description_result = analyze_description(description)
-    if description_result:
-        indicators[description_result] += 1
-
-    # Analyze name for additional clues
-    if name:
-        name_lower = name.lower()
-        if any(term in name_lower for term in ['polska', 'polish', 'nieruchomości']):
-            indicators['polish'] += 1
-        if any(term in name_lower for term in ['marbella', 'spain', 'inmobiliaria', 'costa']):
-            indicators['spain'] += 1
-
-    # Determine final classification
-    polish_score = indicators['polish']
-    spain_score = indicators['spain']
-
-    # Strong indicators for both = spain&poland
-    if polish_score >= 2 and spain_score >= 2:
-        return 'spain&poland'
-    elif polish_score >= 1 and spain_score >= 1:
-        return 'both'
-    elif polish_score > spain_score:
-        return 'polish'
-    elif spain_score > polish_score:
-        return 'marbella'
-    else:
-        # No clear indicators, keep current type or mark as gemini_discovered
-        return current_type if current_type != 'gemini_discovered' else 'gemini_discovered'
-
-def main():
-    """Main function to perform enhanced type classification"""
+    phone_result = analyze_phone_number(phone_lower)
+    website_result = analyze_website_domain(website_lower)
+    address_result = analyze_address(address_lower)
+    description_result = analyze_description(desc_lower)
+
+    # Score with plain ints: phone and website are strong indicators (2 points),
+    # address, description and name clues count 1 each
+    polish_score = (2 * (phone_result == 'polish') + 2 * (website_result == 'polish')
+                    + (address_result == 'polish') + (description_result == 'polish')
+                    + (_POLISH_NAME.search(name_lower) is not None))
+    spain_score = (2 * (phone_result == 'spain') + 2 * (website_result == 'spain')
+                   + (address_result == 'spain') + (description_result == 'spain')
+                   + (_SPAIN_NAME.search(name_lower) is not None))
+
+    # Strong indicators for both = spain&poland; no clear indicators keeps the current type
+    return ('spain&poland' if polish_score >= 2 and spain_score >= 2
+            else 'both' if polish_score >= 1 and spain_score >= 1
+            else 'polish' if polish_score > spain_score
+            else 'marbella' if spain_score > polish_score
+            else current_type)
+
+def main(conn=None, verbose=False):
+    """Main function to perform enhanced type classification (verbose logs every changed row)"""
     logging.info("Starting enhanced type classification...")
 
     try:
-        conn = sqlite3.connect('agencies.db')
+        own_conn = conn is None
+        if own_conn:
+            conn = connect_db()
         cursor = conn.cursor()
 
-        # Get all agencies for re-classification (process recent entries first)
+        # Old types for the change summary; RETURNING only sees the new row
+        old_types = dict(cursor.execute("SELECT id, type FROM agencies"))
+
+        # Classify inside SQLite via a Python UDF, so every changed agency is
+        # updated in one statement instead of a SELECT plus an UPDATE per row
+        conn.create_function("enh_classify", 6, determine_enhanced_type, deterministic=True)
         cursor.execute('''
-            SELECT id, name, website, phone, address, description, type
-            FROM agencies
-            ORDER BY id DESC
+            UPDATE agencies
+            SET type = enh_classify(name, website, phone, address, description, type)
+            WHERE enh_classify(name, website, phone, address, description, type) IS NOT type
+            RETURNING id, name, type
         ''')
 
-        agencies = cursor.fetchall()
-        logging.info(f"Found {len(agencies)} agencies for enhanced classification")
-
         updated_count = 0
         type_changes = {}
+        for agency_id, name, new_type in cursor:
+            old_type = old_types[agency_id]
+            if verbose:
+                logging.info(f"Reclassifying '{name}' from '{old_type}' to '{new_type}'")
 
-        for agency_id, name, website, phone, address, description, current_type in agencies:
-            new_type = determine_enhanced_type(name, website, phone, address, description, current_type)
-
-            if new_type != current_type:
-                logging.info(f"Reclassifying '{name}' from '{current_type}' to '{new_type}'")
-                cursor.execute('''
-                    UPDATE agencies
-                    SET type = ?
-                    WHERE id = ?
-                ''', (new_type, agency_id))
-
-                # Track changes
-                change_key = f"{current_type} -> {new_type}"
-                type_changes[change_key] = type_changes.get(change_key, 0) + 1
+            change_key = f"{old_type} -> {new_type}"
+            type_changes[change_key] = type_changes.get(change_key, 0) + 1
 
-                updated_count += 1
+            updated_count += 1
+            if updated_count % PROGRESS_EVERY == 0:
+                logging.info(f"Reclassified {updated_count} agencies...")
 
         conn.commit()
-        conn.close()
 
         logging.info(f"Successfully updated {updated_count} agencies with enhanced classification")
 
@@ -216,8 +228,6 @@ def main():
             logging.info(f"  {change}: {count} agencies")
 
         # Show final type distribution
-        conn = sqlite3.connect('agencies.db')
-        cursor = conn.cursor()
         cursor.execute('''
             SELECT type, COUNT(*) as count
             FROM agencies
@@ -226,7 +236,8 @@ def main():
         ''')
 
         final_types = cursor.fetchall()
-        conn.close()
+        if own_conn:
+            conn.close()
 
         logging.info("Final type distribution:")
         for agency_type, count in final_types:
@@ -236,4 +247,10 @@ def main():
         logging.error(f"Error during enhanced type classification: {e}")
 
 if __name__ == '__main__':
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Reclassify agency types from phone, website, address and description')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Log every changed row')
+
+    args = parser.parse_args()
+    main(verbose=args.verbose)
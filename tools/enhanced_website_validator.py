@@ -10,12 +10,23 @@ This script provides comprehensive website validation including:
 """
 
 import sqlite3
+import socket
 import requests
 import logging
 import time
 import json
-from urllib.parse import urlparse, urljoin
-from typing import Dict, List, Tuple, Optional
+import threading
+from collections import deque, namedtuple
+from contextlib import ExitStack, contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from functools import lru_cache
+from urllib.parse import urlparse, urlsplit, urljoin
+from typing import Dict, Iterable, List, Tuple, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.util.connection import allowed_gai_family
+
+from _db import connect_db, ensure_status_index, ensure_website_columns
 
 # Configure logging
 logging.basicConfig(
@@ -23,14 +34,191 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+# URL checks are network-bound, so validate several agencies at once
+VALIDATION_CONCURRENCY = 16
+
+# Agencies submitted to the pool ahead of the one being written, so rows are
+# pulled from the cursor as workers free up instead of all at once
+SUBMIT_WINDOW = VALIDATION_CONCURRENCY * 2
+
+# Minimum spacing between requests to the same host, in seconds
+PER_HOST_DELAY = 1
+
+# Validation results are written in one transaction per batch
+WRITE_BATCH_SIZE = 200
+
+# Alternative URLs probed at once across all agencies being validated
+ALTERNATIVE_PROBE_CONCURRENCY = 32
+
+# Keep-alive pool per host, sized for the worker pool and the alternative
+# URLs probed against the same domain
+HTTP_POOL_SIZE = 64
+
+# Alternatives for one agency share a host, so resolve each host once per
+# DNS_CACHE_TTL window instead of once per probe. urllib3 resolves through
+# socket.getaddrinfo when it opens a pooled connection, so this cache also
+# serves the session adapter; connecting by IP would only add SNI/hostname
+# verification plumbing for the same saving
+DNS_CACHE_TTL = 300
+_system_getaddrinfo = socket.getaddrinfo
+
+@lru_cache(maxsize=4096)
+def _cached_getaddrinfo(host, port, family, type, proto, flags, ttl_bucket):
+    """Resolve through the system resolver; ttl_bucket expires entries every DNS_CACHE_TTL seconds"""
+    return tuple(_system_getaddrinfo(host, port, family, type, proto, flags))
+
+def _getaddrinfo_with_cache(host, port, family=0, type=0, proto=0, flags=0):
+    """Drop-in socket.getaddrinfo replacement backed by _cached_getaddrinfo"""
+    return list(_cached_getaddrinfo(host, port, family, type, proto, flags, int(time.time() // DNS_CACHE_TTL)))
+
+# Resolver threads for prefetch lookups and their replicas, created per run
+DNS_RESOLVER_THREADS = 32
+_dns_executor: Optional[ThreadPoolExecutor] = None
+
+@contextmanager
+def dns_cache():
+    """Route socket.getaddrinfo through the TTL cache until the block exits"""
+    global _dns_executor
+    previous = socket.getaddrinfo, _dns_executor
+    executor = ThreadPoolExecutor(max_workers=DNS_RESOLVER_THREADS, thread_name_prefix='dns')
+    socket.getaddrinfo, _dns_executor = _getaddrinfo_with_cache, executor
+    try:
+        yield
+    finally:
+        socket.getaddrinfo, _dns_executor = previous
+        executor.shutdown(wait=False, cancel_futures=True)
+
+# Replicate slow lookups: a second and third resolver query are started at
+# these offsets (seconds) unless an earlier one has already answered
+DNS_PREFETCH_STAGGER = (0, 0.2, 0.3)
+
+# Hosts warmed at once by prefetch_dns
+DNS_PREFETCH_CONCURRENCY = 8
+
+def _resolve_staggered(resolver: ThreadPoolExecutor, host: str, port: int, stagger=DNS_PREFETCH_STAGGER) -> bool:
+    """Warm the DNS cache for host:port with staggered replicated lookups, True on first success"""
+    # Same key urllib3 uses when it opens the connection, so the probe hits the cache
+    key = (host, port, allowed_gai_family(), socket.SOCK_STREAM, 0, 0, int(time.time() // DNS_CACHE_TTL))
+    start = time.monotonic()
+    pending = set()
+
+    for offset in stagger:
+        if pending:
+            done, pending = wait(pending, timeout=max(0, start + offset - time.monotonic()), return_when=FIRST_COMPLETED)
+            if any(f.exception() is None for f in done):
+                return True
+            # A replica only helps a lookup that is in flight, not one still
+            # queued behind other hosts' lookups
+            if pending and not any(f.running() for f in pending):
+                continue
+        pending.add(resolver.submit(_cached_getaddrinfo, *key))
+
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        if any(f.exception() is None for f in done):
+            return True
+    return False
+
+def prefetch_dns(urls: List[str], replicate: bool = True):
+    """Resolve the distinct hosts of urls in parallel before they are probed (one lookup each unless replicate)"""
+    # Outside dns_cache() there is no cache to warm
+    resolver = _dns_executor
+    if resolver is None:
+        return
+
+    stagger = DNS_PREFETCH_STAGGER if replicate else DNS_PREFETCH_STAGGER[:1]
+    hosts = set()
+    for url in urls:
+        try:
+            parsed = urlparse(url)
+            if parsed.hostname:
+                hosts.add((parsed.hostname, parsed.port or (443 if parsed.scheme == 'https' else 80)))
+        except ValueError:
+            continue
+
+    if len(hosts) > 1:
+        with ThreadPoolExecutor(max_workers=min(len(hosts), DNS_PREFETCH_CONCURRENCY)) as executor:
+            list(executor.map(lambda h: _resolve_staggered(resolver, *h, stagger), hosts))
+
+# One hop of a redirect chain; kept as a tuple until it is written to the database
+Redirect = namedtuple('Redirect', 'frm to status')
+
+# The syntax helpers are pure and see the same URLs repeatedly (originals and
+# their alternatives), so their results are memoized
+@lru_cache(maxsize=8192)
+def is_valid_url_syntax(url: str) -> bool:
+    """Check if URL has valid syntax"""
+    try:
+        result = urlparse(url)
+        return bool(result.scheme and result.netloc)
+    except:
+        return False
+
+@lru_cache(maxsize=8192)
+def fix_url_syntax(url: str) -> Optional[str]:
+    """Try to fix common URL syntax issues"""
+    url = url.strip()
+
+    # Remove trailing punctuation
+    url = url.rstrip('.,;:!?)')
+
+    # Add https:// if missing scheme
+    if not url.startswith(('http://', 'https://')):
+        if url.startswith('www.'):
+            url = f'https://{url}'
+        else:
+            url = f'https://www.{url}'
+
+    return url if is_valid_url_syntax(url) else None
+
+# TLDs to try when a site is unreachable under its own, in probe order
+TLD_SWAPS = {
+    'pl': ('es', 'com', 'eu'),
+    'es': ('pl', 'com', 'eu'),
+    'com': ('pl', 'es'),
+    'eu': ('pl', 'es', 'com'),
+}
+
+# HEAD responses that often mean "HEAD not supported" rather than a dead site
+HEAD_REJECTED_STATUSES = (400, 403, 405)
+
 class EnhancedWebsiteValidator:
     def __init__(self, use_chrome_devtools=False):
         self.use_chrome_devtools = use_chrome_devtools
         self.session = requests.Session()
         self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Connection': 'keep-alive'
         })
 
+        # Reuse TCP/TLS connections across probes and retry transient failures;
+        # raise_on_status=False keeps the final status code for classification
+        retry = Retry(total=2, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504], raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # Resolve through the TTL DNS cache until close()
+        self._dns_scope = ExitStack()
+        self._dns_scope.enter_context(dns_cache())
+
+        # Probe results by normalized URL, so agencies sharing a domain and
+        # repeated alternatives are only requested once per run
+        self._probe_cache: Dict[str, Dict] = {}
+
+        # Rate limiting per host rather than per agency: next allowed request time by hostname
+        self._last_hit: Dict[str, float] = {}
+        self._last_hit_lock = threading.Lock()
+
+        # One bounded pool for alternative probes, shared by every agency
+        self._alt_executor = ThreadPoolExecutor(max_workers=ALTERNATIVE_PROBE_CONCURRENCY, thread_name_prefix='alt')
+
+    def close(self):
+        """Stop the alternative probe pool, close the HTTP session and restore DNS resolution"""
+        self._alt_executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+        self._dns_scope.close()
+
     def validate_url_comprehensive(self, url: str) -> Dict:
         """
         Comprehensive URL validation with multiple stages and corrections
@@ -69,39 +257,28 @@ class EnhancedWebsiteValidator:
                 })
             return result
 
-        # Stage 2: HTTP -> HTTPS upgrade attempt
-        if url.startswith('http://'):
-            https_url = url.replace('http://', 'https://', 1)
-            https_result = self._check_url_basic(https_url)
-            if https_result['status'] == 'active':
-                result['final_url'] = https_url
-                result['status'] = 'upgraded_to_https'
-                result['redirects'] = https_result.get('redirects', [])
-                return result
-
-        # Stage 3: Basic accessibility check
+        # Stage 2: Basic accessibility check; an HTTP -> HTTPS redirect by
+        # the server itself is reported as upgraded_to_https
         basic_result = self._check_url_basic(url)
         result.update(basic_result)
 
-        # Stage 4: Try common URL variations if basic check failed
+        # Stage 3: Try common URL variations if basic check failed
         if result['status'] in ['connection_error', 'not_found', 'timeout']:
             alternatives = self._generate_url_alternatives(url)
-            for alt_url, reason in alternatives:
-                alt_result = self._check_url_basic(alt_url)
-                if alt_result['status'] == 'active':
-                    result['alternatives'].append({
-                        'url': alt_url,
-                        'reason': reason,
-                        'priority': 2,
-                        'status': 'active'
-                    })
-                    # If this is our first working alternative, use it as final
-                    if result['status'] != 'active':
-                        result['final_url'] = alt_url
-                        result['status'] = 'corrected'
-                        result['redirects'] = alt_result.get('redirects', [])
-
-        # Stage 5: Chrome DevTools validation (if enabled)
+            prefetch_dns([alt_url for alt_url, _ in alternatives])
+            alt_url, reason, alt_result = self._first_active_alternative(alternatives)
+            if alt_url:
+                result['alternatives'].append({
+                    'url': alt_url,
+                    'reason': reason,
+                    'priority': 2,
+                    'status': 'active'
+                })
+                result['final_url'] = alt_result.get('final_url', alt_url)
+                result['status'] = 'corrected'
+                result['redirects'] = alt_result.get('redirects', [])
+
+        # Stage 4: Chrome DevTools validation (if enabled)
         if self.use_chrome_devtools and result['status'] == 'active':
             chrome_result = self._validate_with_chrome_devtools(result['final_url'])
             result.update(chrome_result)
@@ -110,29 +287,32 @@ class EnhancedWebsiteValidator:
 
     def _is_valid_url_syntax(self, url: str) -> bool:
         """Check if URL has valid syntax"""
-        try:
-            result = urlparse(url)
-            return bool(result.scheme and result.netloc)
-        except:
-            return False
+        return is_valid_url_syntax(url)
 
     def _fix_url_syntax(self, url: str) -> Optional[str]:
         """Try to fix common URL syntax issues"""
-        url = url.strip()
-
-        # Remove trailing punctuation
-        url = url.rstrip('.,;:!?)')
-
-        # Add https:// if missing scheme
-        if not url.startswith(('http://', 'https://')):
-            if url.startswith('www.'):
-                url = f'https://{url}'
-            else:
-                url = f'https://www.{url}'
-
-        return url if self._is_valid_url_syntax(url) else None
+        return fix_url_syntax(url)
 
     def _check_url_basic(self, url: str) -> Dict:
+        """Basic URL accessibility check, answered from the probe cache when possible"""
+        key = url.rstrip('/').lower()
+        cached = self._probe_cache.get(key)
+        if cached is None:
+            cached = self._probe_cache[key] = self._probe_url(url)
+        return dict(cached)
+
+    def _wait_for_host(self, url: str):
+        """Sleep until PER_HOST_DELAY has passed since the previous request to url's host"""
+        host = urlparse(url).hostname or ''
+        # Reserve the next slot under the lock, then sleep outside it so other hosts aren't blocked
+        with self._last_hit_lock:
+            now = time.monotonic()
+            slot = max(now, self._last_hit.get(host, 0) + PER_HOST_DELAY)
+            self._last_hit[host] = slot
+        if slot > now:
+            time.sleep(slot - now)
+
+    def _probe_url(self, url: str) -> Dict:
         """Basic URL accessibility check with redirect following"""
         result = {
             'status': 'unknown',
@@ -140,11 +320,26 @@ class EnhancedWebsiteValidator:
         }
 
         try:
+            self._wait_for_host(url)
+
             # First try HEAD request
             response = self.session.head(url, timeout=15, allow_redirects=True)
 
-            if response.status_code == 200:
+            # Some servers reject HEAD outright; confirm with a streamed GET
+            # asking for a single byte, closed before the body is read
+            if response.status_code in HEAD_REJECTED_STATUSES:
+                with self.session.get(url, timeout=15, allow_redirects=True, stream=True,
+                                      headers={'Range': 'bytes=0-0'}) as response:
+                    pass
+
+            if response.status_code in (200, 206):
                 result['status'] = 'active'
+                # Only a redirect to https on the same host is an upgrade; one to
+                # another host (parked or rebranded domain) leaves the URL as it is
+                if (url.startswith('http://') and response.url.startswith('https://')
+                        and urlsplit(response.url).hostname == urlsplit(url).hostname):
+                    result['status'] = 'upgraded_to_https'
+                    result['final_url'] = urlsplit(url)._replace(scheme='https').geturl()
             elif response.status_code in [301, 302, 303, 307, 308]:
                 result['status'] = 'redirect'
             elif response.status_code == 404:
@@ -157,11 +352,7 @@ class EnhancedWebsiteValidator:
             # Capture redirect chain
             if response.history:
                 result['redirects'] = [
-                    {
-                        'from': resp.url,
-                        'to': resp.headers.get('Location', ''),
-                        'status': resp.status_code
-                    }
+                    Redirect(resp.url, resp.headers.get('Location', ''), resp.status_code)
                     for resp in response.history
                 ]
 
@@ -177,48 +368,59 @@ class EnhancedWebsiteValidator:
 
         return result
 
+    def _first_active_alternative(self, alternatives: List[Tuple[str, str]]) -> Tuple[Optional[str], Optional[str], Dict]:
+        """Probe all alternatives in parallel, returns (url, reason, result) of the first active one"""
+        if not alternatives:
+            return None, None, {}
+
+        futures = {self._alt_executor.submit(self._check_url_basic, alt_url): (alt_url, reason) for alt_url, reason in alternatives}
+        try:
+            for future in as_completed(futures):
+                alt_result = future.result()
+                if alt_result['status'] in ('active', 'upgraded_to_https'):
+                    alt_url, reason = futures[future]
+                    return alt_url, reason, alt_result
+            return None, None, {}
+        finally:
+            # Don't start the remaining probes once a winner is known
+            for future in futures:
+                future.cancel()
+
     def _generate_url_alternatives(self, url: str) -> List[Tuple[str, str]]:
         """Generate alternative URL variations to try"""
-        alternatives = []
-        parsed = urlparse(url)
+        alternatives = {}
+        parts = urlsplit(url)
 
-        if not parsed.netloc:
-            return alternatives
+        if not parts.netloc:
+            return []
 
-        domain = parsed.netloc
-        path = parsed.path or '/'
+        domain = parts.netloc
+
+        def with_domain(new_domain):
+            return parts._replace(netloc=new_domain).geturl()
 
         # Try www. prefix variations
         if domain.startswith('www.'):
             # Remove www.
-            no_www = domain[4:]
-            alternatives.append((url.replace(domain, no_www), 'remove_www'))
+            alternatives.setdefault(with_domain(domain[4:]), 'remove_www')
         else:
             # Add www.
-            with_www = f'www.{domain}'
-            alternatives.append((url.replace(domain, with_www), 'add_www'))
+            alternatives.setdefault(with_domain(f'www.{domain}'), 'add_www')
 
         # Try HTTPS variations
-        if url.startswith('http://'):
-            https_url = url.replace('http://', 'https://', 1)
-            alternatives.append((https_url, 'upgrade_https'))
-        elif url.startswith('https://'):
-            http_url = url.replace('https://', 'http://', 1)
-            alternatives.append((http_url, 'downgrade_http'))
+        if parts.scheme == 'http':
+            alternatives.setdefault(parts._replace(scheme='https').geturl(), 'upgrade_https')
+        elif parts.scheme == 'https':
+            alternatives.setdefault(parts._replace(scheme='http').geturl(), 'downgrade_http')
 
         # Try common TLD variations for Polish/Spanish sites
-        if domain.endswith('.pl'):
-            es_domain = domain.replace('.pl', '.es')
-            alternatives.append((url.replace(domain, es_domain), 'tld_pl_to_es'))
-            com_domain = domain.replace('.pl', '.com')
-            alternatives.append((url.replace(domain, com_domain), 'tld_pl_to_com'))
-        elif domain.endswith('.es'):
-            pl_domain = domain.replace('.es', '.pl')
-            alternatives.append((url.replace(domain, pl_domain), 'tld_es_to_pl'))
-            com_domain = domain.replace('.es', '.com')
-            alternatives.append((url.replace(domain, com_domain), 'tld_es_to_com'))
+        root, _, suffix = domain.rpartition('.')
+        for tld in TLD_SWAPS.get(suffix.lower(), ()):
+            alternatives.setdefault(with_domain(f'{root}.{tld}'), f'tld_{suffix.lower()}_to_{tld}')
 
-        return alternatives
+        # Variations can coincide or reproduce the original URL; probe each distinct one once
+        alternatives.pop(url, None)
+        return list(alternatives.items())
 
     def _validate_with_chrome_devtools(self, url: str) -> Dict:
         """Use Chrome DevTools to validate URL (placeholder for MCP integration)"""
@@ -255,129 +457,178 @@ class EnhancedWebsiteValidator:
 
         return alternatives
 
+def _redirect_as_dict(redirect) -> Dict:
+    """Convert a Redirect to the {'from', 'to', 'status'} form stored in redirect_chain"""
+    if isinstance(redirect, Redirect):
+        return {'from': redirect.frm, 'to': redirect.to, 'status': redirect.status}
+    return redirect
+
+# Every validation result is written with this one statement; columns bound
+# to NULL keep their current value, so the SQL text never varies per row
+WEBSITE_UPDATE_SQL = '''
+    UPDATE agencies SET
+        website = COALESCE(?, website),
+        website_status = ?,
+        alternative_urls = COALESCE(?, alternative_urls),
+        redirect_chain = COALESCE(?, redirect_chain),
+        security_warnings = COALESCE(?, security_warnings),
+        url_validation_date = datetime('now')
+    WHERE id = ?
+'''
+
+def _website_update_row(agency_id: int, validation_result: Dict) -> Tuple:
+    """Return the WEBSITE_UPDATE_SQL parameters for an agency's validation result"""
+    final_url = validation_result.get('final_url')
+    alternatives = validation_result.get('alternatives')
+    redirects = validation_result.get('redirects')
+    security_warnings = validation_result.get('security_warnings')
+
+    return (
+        # Update main website only if we found a better one
+        final_url if final_url and final_url != validation_result.get('original_url') else None,
+        validation_result.get('status', 'unknown'),
+        json.dumps(alternatives) if alternatives else None,
+        json.dumps([_redirect_as_dict(redirect) for redirect in redirects]) if redirects else None,
+        json.dumps(security_warnings) if security_warnings else None,
+        agency_id
+    )
+
+def update_agency_websites(conn: sqlite3.Connection, results: Iterable[Tuple[int, Dict]]) -> int:
+    """Write (agency_id, validation_result) pairs in one transaction, returns the number written"""
+    rows = [_website_update_row(agency_id, validation_result) for agency_id, validation_result in results]
+    try:
+        with conn:
+            conn.executemany(WEBSITE_UPDATE_SQL, rows)
+        return len(rows)
+    except sqlite3.Error as e:
+        logging.error(f"Error writing batch of {len(rows)} website results, retrying row by row: {e}")
+
+    # The failed batch was rolled back; write each row on its own so one bad
+    # row doesn't lose the rest
+    written = 0
+    for row in rows:
+        try:
+            with conn:
+                conn.execute(WEBSITE_UPDATE_SQL, row)
+            written += 1
+        except sqlite3.Error as e:
+            logging.error(f"Error updating agency {row[-1]} website data: {e}")
+    return written
+
 def update_agency_website(agency_id: int, validation_result: Dict):
     """Update agency record with enhanced website validation results"""
     try:
-        conn = sqlite3.connect('agencies.db')
-        cursor = conn.cursor()
-
-        # Prepare data for database
-        final_url = validation_result.get('final_url')
-        status = validation_result.get('status', 'unknown')
-        alternatives = validation_result.get('alternatives', [])
-        redirects = validation_result.get('redirects', [])
-        security_warnings = validation_result.get('security_warnings', [])
-
-        # Update main website if we found a better one
-        update_fields = []
-        update_values = []
-
-        if final_url and final_url != validation_result.get('original_url'):
-            update_fields.append('website = ?')
-            update_values.append(final_url)
+        conn = connect_db()
+        try:
+            ensure_website_columns(conn)
+            return update_agency_websites(conn, [(agency_id, validation_result)]) == 1
+        finally:
+            conn.close()
 
-        # Always update status
-        update_fields.append('website_status = ?')
-        update_values.append(status)
+    except Exception as e:
+        logging.error(f"Error updating agency website data: {e}")
+        return False
 
-        # Add new fields for enhanced data
+def validate_agency(validator: EnhancedWebsiteValidator, agency: Tuple) -> Tuple[int, Dict]:
+    """Validate (or try to discover) one agency's website, returns (agency_id, result)"""
+    agency_id, name, website, city = agency
+    logging.info(f"Validating: {name}")
+
+    if website and website.strip():
+        # Validate existing website
+        result = validator.validate_url_comprehensive(website.strip())
+        logging.info(f"  {name}: {result['status']} -> {result.get('final_url', 'N/A')}")
+    else:
+        # Try to find missing website
+        alternatives = validator.find_missing_websites(name, city)
         if alternatives:
-            update_fields.append('alternative_urls = ?')
-            update_values.append(json.dumps(alternatives))
-
-        if redirects:
-            update_fields.append('redirect_chain = ?')
-            update_values.append(json.dumps(redirects))
-
-        if security_warnings:
-            update_fields.append('security_warnings = ?')
-            update_values.append(json.dumps(security_warnings))
-
-        # Add validation timestamp
-        update_fields.append('url_validation_date = datetime(\'now\')')
-
-        if update_fields:
-            query = f'UPDATE agencies SET {", ".join(update_fields)} WHERE id = ?'
-            update_values.append(agency_id)
-
-            cursor.execute(query, update_values)
+            result = {
+                'original_url': None,
+                'final_url': alternatives[0]['url'] if alternatives else None,
+                'status': 'discovered',
+                'alternatives': alternatives
+            }
+            logging.info(f"  {name}: discovered potential website: {result['final_url']}")
+        else:
+            result = {
+                'original_url': None,
+                'final_url': None,
+                'status': 'not_found',
+                'alternatives': []
+            }
+            logging.info(f"  {name}: no website found")
 
-        conn.commit()
-        conn.close()
-        return True
+    return agency_id, result
 
-    except Exception as e:
-        logging.error(f"Error updating agency website data: {e}")
-        return False
+def bounded_map(executor: ThreadPoolExecutor, fn, items: Iterable, window: int):
+    """Like executor.map, but keeps at most `window` items in flight"""
+    in_flight = deque()
+    for item in items:
+        in_flight.append(executor.submit(fn, item))
+        if len(in_flight) >= window:
+            yield in_flight.popleft().result()
+    while in_flight:
+        yield in_flight.popleft().result()
 
-def main():
+def main(conn=None):
     """Main function to run enhanced website validation"""
     logging.info("Starting enhanced website validation...")
 
     validator = EnhancedWebsiteValidator(use_chrome_devtools=False)  # Set to True when Chrome DevTools is ready
 
     try:
-        conn = sqlite3.connect('agencies.db')
-        cursor = conn.cursor()
-
-        # Get agencies that need validation (missing websites or broken ones)
-        cursor.execute('''
-            SELECT id, name, website, polish_city
-            FROM agencies
-            WHERE (website IS NULL OR website = '' OR
-                   website_status IN ('connection_error', 'not_found', 'timeout', 'invalid_url'))
-            AND type != 'undefined'
-            ORDER BY id
-        ''')
-
-        agencies = cursor.fetchall()
-        conn.close()
-
-        logging.info(f"Found {len(agencies)} agencies needing website validation")
-
-        updated_count = 0
-        found_alternatives_count = 0
-
-        for agency_id, name, website, city in agencies:
-            logging.info(f"Validating: {name}")
-
-            if website and website.strip():
-                # Validate existing website
-                result = validator.validate_url_comprehensive(website.strip())
-                logging.info(f"  Result: {result['status']} -> {result.get('final_url', 'N/A')}")
-            else:
-                # Try to find missing website
-                alternatives = validator.find_missing_websites(name, city)
-                if alternatives:
-                    result = {
-                        'original_url': None,
-                        'final_url': alternatives[0]['url'] if alternatives else None,
-                        'status': 'discovered',
-                        'alternatives': alternatives
-                    }
-                    found_alternatives_count += 1
-                    logging.info(f"  Discovered potential website: {result['final_url']}")
-                else:
-                    result = {
-                        'original_url': None,
-                        'final_url': None,
-                        'status': 'not_found',
-                        'alternatives': []
-                    }
-                    logging.info("  No website found")
+        own_conn = conn is None
+        if own_conn:
+            conn = connect_db()
+        try:
+            ensure_status_index(conn)
+            ensure_website_columns(conn)
+            cursor = conn.cursor()
+
+            # Agencies that need validation (missing websites or broken ones)
+            needs_validation = '''
+                FROM agencies
+                WHERE (website IS NULL OR website = '' OR
+                       website_status IN ('connection_error', 'not_found', 'timeout', 'invalid_url'))
+                AND type != 'undefined'
+            '''
+
+            cursor.execute(f"SELECT COUNT(*) {needs_validation}")
+            total = cursor.fetchone()[0]
+
+            logging.info(f"Found {total} agencies needing website validation")
+
+            updated_count = 0
+            found_alternatives_count = 0
+            pending = []
+
+            # Submit rows from the cursor with at most SUBMIT_WINDOW checks in
+            # flight, draining results in order; database writes stay on this
+            # thread and are flushed in batches of WRITE_BATCH_SIZE
+            cursor.execute(f"SELECT id, name, website, polish_city {needs_validation} ORDER BY id")
+            with ThreadPoolExecutor(max_workers=VALIDATION_CONCURRENCY) as executor:
+                for agency_id, result in bounded_map(executor, lambda agency: validate_agency(validator, agency),
+                                                     cursor, SUBMIT_WINDOW):
+                    if result['status'] == 'discovered':
+                        found_alternatives_count += 1
+
+                    pending.append((agency_id, result))
+                    if len(pending) >= WRITE_BATCH_SIZE:
+                        updated_count += update_agency_websites(conn, pending)
+                        pending.clear()
 
             # Update database
-            if update_agency_website(agency_id, result):
-                updated_count += 1
-
-            # Rate limiting
-            time.sleep(1)
+            updated_count += update_agency_websites(conn, pending)
+        finally:
+            validator.close()
+            if own_conn:
+                conn.close()
 
         logging.info(f"Enhanced validation complete: {updated_count} agencies updated, {found_alternatives_count} new websites discovered")
 
         # Show summary
         print("\n✅ Enhanced Website Validation Complete!")
-        print(f"   📊 Agencies processed: {len(agencies)}")
+        print(f"   📊 Agencies processed: {total}")
         print(f"   📊 Database updated: {updated_count}")
         print(f"   📊 New websites discovered: {found_alternatives_count}")
 
@@ -4,17 +4,20 @@ Enrich Inactive Agencies - Uses Gemini AI to search for more information about i
 that have name and address data.
 """
 
-import sqlite3
+import re
 import json
 import os
 import sys
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import logging
 
 # Add parent directory to path to import GeminiAgencyFinder
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from gemini_agency_finder import GeminiAgencyFinder
+from gemini_agency_finder import GeminiAgencyFinder, RateLimiter
+from _db import connect_db, ensure_status_index
 
 # Configure logging
 logging.basicConfig(
@@ -26,16 +29,35 @@ logging.basicConfig(
     ]
 )
 
+# Gemini calls are network-bound; run a few at once, paced by the shared RateLimiter
+ENRICHMENT_CONCURRENCY = 4
+
+# additional_info accumulates one note per enrichment; cap it to this many characters
+ADDITIONAL_INFO_MAX_CHARS = 2048
+
+# Patterns used to pull contact details out of Gemini's free-text answers
+_URL_RE = re.compile(r'https?://\S+')
+_PHONE_RE = re.compile(r'\+?[\d\s\-\(\)]{7,}')
+
 class InactiveAgencyEnricher:
     def __init__(self, db_path='agencies.db'):
         self.db_path = db_path
         self.finder = GeminiAgencyFinder(db_path=db_path)
+        self.rate_limiter = RateLimiter()
+
+        # One WAL connection for the whole run, shared behind a lock
+        self.conn = connect_db(db_path, check_same_thread=False)
+        self.db_lock = threading.Lock()
+        ensure_status_index(self.conn)
+
+    def close(self):
+        """Close the enricher's database connection"""
+        self.conn.close()
 
     def get_inactive_agencies_with_data(self):
         """Get agencies that are inactive but have name and address information"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            cursor = self.conn.cursor()
 
             # Query for inactive agencies based on the frontend logic
             cursor.execute('''
@@ -49,7 +71,7 @@ class InactiveAgencyEnricher:
             ''')
 
             agencies = []
-            for row in cursor.fetchall():
+            for row in cursor:
                 agency_id, name, website, phone, address, description, website_status, alternative_urls = row
 
                 # Check if there are any working alternatives
@@ -76,7 +98,6 @@ class InactiveAgencyEnricher:
                         'website_status': website_status
                     })
 
-            conn.close()
             return agencies
 
         except Exception as e:
@@ -109,6 +130,7 @@ Return the information in a clear, structured format."""
 
         for attempt in range(max_retries):
             try:
+                self.rate_limiter.acquire()
                 response = self.finder.run_gemini_prompt(prompt, use_web_search=True)
                 if response:
                     logging.info(f"✅ Got response for {name} (attempt {attempt + 1})")
@@ -125,7 +147,6 @@ Return the information in a clear, structured format."""
 
     def parse_enrichment_response(self, response):
         """Parse the Gemini response to extract useful information"""
-        import re
         updates = {}
 
         # Look for specific patterns in the response
@@ -135,23 +156,24 @@ Return the information in a clear, structured format."""
             line = line.strip()
             if not line:
                 continue
+            lowered = line.lower()
 
             # Extract website
-            if 'website' in line.lower() and ('http' in line or 'www' in line):
+            if 'website' in lowered and ('http' in line or 'www' in line):
                 # Try to extract URL
-                url_match = re.search(r'https?://[^\s]+', line)
+                url_match = _URL_RE.search(line)
                 if url_match:
                     updates['website'] = url_match.group(0).rstrip('.,;')
 
             # Extract phone
-            if 'phone' in line.lower() or 'tel' in line.lower():
+            if 'phone' in lowered or 'tel' in lowered:
                 # Try to extract phone number
-                phone_match = re.search(r'[\+]?[\d\s\-\(\)]{7,}', line)
+                phone_match = _PHONE_RE.search(line)
                 if phone_match:
                     updates['phone'] = phone_match.group(0).strip()
 
             # Extract address
-            if 'address' in line.lower() or 'location' in line.lower():
+            if 'address' in lowered or 'location' in lowered:
                 # Take the rest of the line as address
                 addr_part = line.split(':', 1)[-1].strip()
                 if addr_part and len(addr_part) > 10:  # Reasonable address length
@@ -169,9 +191,6 @@ Return the information in a clear, structured format."""
             return False
 
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
             # Build update query
             set_parts = []
             values = []
@@ -182,27 +201,23 @@ Return the information in a clear, structured format."""
                     set_parts.append(f"{field} = ?")
                     values.append(value.strip())
 
-            if set_parts:
-                query = f"UPDATE agencies SET {', '.join(set_parts)} WHERE id = ?"
-                values.append(agency_id)
+            if not set_parts:
+                return False
 
-                cursor.execute(query, values)
-                conn.commit()
+            # Add enrichment note to additional_info in the same statement, keeping
+            # only the newest ADDITIONAL_INFO_MAX_CHARS so repeated runs don't grow the row
+            enrichment_note = f" | Enriched inactive agency data via Gemini search on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+            set_parts.append(f"additional_info = substr(COALESCE(additional_info, '') || ?, -{ADDITIONAL_INFO_MAX_CHARS})")
+            values.append(enrichment_note)
 
-                # Add enrichment note to additional_info
-                enrichment_note = f" | Enriched inactive agency data via Gemini search on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                cursor.execute('''
-                    UPDATE agencies
-                    SET additional_info = COALESCE(additional_info, '') || ?
-                    WHERE id = ?
-                ''', (enrichment_note, agency_id))
-                conn.commit()
+            query = f"UPDATE agencies SET {', '.join(set_parts)} WHERE id = ?"
+            values.append(agency_id)
 
-                logging.info(f"✅ Updated agency {agency_id} with: {list(updates.keys())}")
-                return True
+            with self.db_lock, self.conn:
+                self.conn.execute(query, values)
 
-            conn.close()
-            return False
+            logging.info(f"✅ Updated agency {agency_id} with: {list(updates.keys())}")
+            return True
 
         except Exception as e:
             logging.error(f"Error updating agency {agency_id}: {e}")
@@ -229,33 +244,35 @@ Return the information in a clear, structured format."""
         enriched_count = 0
         total_processed = 0
 
-        for agency in inactive_agencies:
-            print(f"\n🔎 [{total_processed + 1}/{len(inactive_agencies)}] Processing: {agency['name']}")
-            logging.info(f"Processing agency: {agency['name']} (ID: {agency['id']})")
+        # Gemini lookups run on worker threads; results are handled (and the
+        # database written) here on the calling thread, one at a time
+        with ThreadPoolExecutor(max_workers=ENRICHMENT_CONCURRENCY) as executor:
+            futures = {executor.submit(self.enrich_agency_info, agency): agency for agency in inactive_agencies}
 
-            # Get enrichment data
-            updates = self.enrich_agency_info(agency)
+            for future in as_completed(futures):
+                agency = futures[future]
+                print(f"\n🔎 [{total_processed + 1}/{len(inactive_agencies)}] Processed: {agency['name']}")
+                logging.info(f"Processing agency: {agency['name']} (ID: {agency['id']})")
 
-            if updates:
-                print(f"   📝 Found updates: {', '.join([k for k in updates.keys() if not k.startswith('_')])}")
+                # Get enrichment data
+                updates = future.result()
 
-                if not dry_run:
-                    if self.update_agency_in_db(agency['id'], updates):
-                        enriched_count += 1
-                        print("   ✅ Database updated")
+                if updates:
+                    print(f"   📝 Found updates: {', '.join([k for k in updates.keys() if not k.startswith('_')])}")
+
+                    if not dry_run:
+                        if self.update_agency_in_db(agency['id'], updates):
+                            enriched_count += 1
+                            print("   ✅ Database updated")
+                        else:
+                            print("   ❌ Failed to update database")
                     else:
-                        print("   ❌ Failed to update database")
+                        print("   🔍 Dry run - would update database")
+                        enriched_count += 1  # Count as enriched for dry run
                 else:
-                    print("   🔍 Dry run - would update database")
-                    enriched_count += 1  # Count as enriched for dry run
-            else:
-                print("   ⚠️ No useful information found")
-
-            total_processed += 1
+                    print("   ⚠️ No useful information found")
 
-            # Rate limiting
-            if total_processed < len(inactive_agencies):
-                time.sleep(3)
+                total_processed += 1
 
         print(f"\n🎉 Enrichment complete!")
         print(f"📊 Processed: {total_processed} agencies")
@@ -282,10 +299,13 @@ def main():
         print("🔍 DRY RUN MODE - No database changes will be made")
         print("=" * 50)
 
-    enriched_count = enricher.run_enrichment(
-        max_agencies=args.max_agencies,
-        dry_run=args.dry_run
-    )
+    try:
+        enriched_count = enricher.run_enrichment(
+            max_agencies=args.max_agencies,
+            dry_run=args.dry_run
+        )
+    finally:
+        enricher.close()
 
     print(f"\n🏁 Script completed. Enriched {enriched_count} agencies.")
 
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Export the agencies table to agencies.json for the web interface.
+
+In-process equivalent of tools/update_data.sh: the JSON document is built by
+SQLite itself with json_group_array/json_object in a single statement and
+written atomically, so callers don't need to spawn bash and the sqlite3 CLI.
+"""
+
+import os
+import sqlite3
+import tempfile
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def export_agencies_json(db_path='agencies.db', output_path='agencies.json'):
+    """Export all agencies (ordered by name) to a JSON file, returns the number exported"""
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+
+        # Build json_object('col', col, ...) from the live schema so new columns are exported too
+        cursor.execute("PRAGMA table_info(agencies)")
+        columns = [row[1] for row in cursor.fetchall()]
+        object_args = ', '.join(f"'{column}', \"{column}\"" for column in columns)
+
+        cursor.execute(f'''
+            SELECT json_group_array(json_object({object_args})), COUNT(*)
+            FROM (SELECT * FROM agencies ORDER BY name)
+        ''')
+        data, count = cursor.fetchone()
+    finally:
+        conn.close()
+
+    # Write to a temp file in the same directory and swap it in atomically
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    fd, tmp_path = tempfile.mkstemp(dir=output_dir, prefix='.agencies-', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)  # mkstemp creates 0600, keep the export world-readable
+        os.replace(tmp_path, output_path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+    return count
+
+def main():
+    """Main function to export agency data for the web interface"""
+    logging.info("Exporting agency data for web interface...")
+
+    try:
+        count = export_agencies_json()
+        logging.info(f"Exported {count} agencies to agencies.json")
+        print(f"✅ Data export successful ({count} agencies)")
+
+    except Exception as e:
+        logging.error(f"Error exporting agency data: {e}")
+        print(f"❌ Error: Failed to export data: {e}")
+
+if __name__ == '__main__':
+    main()
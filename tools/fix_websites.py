@@ -4,27 +4,55 @@ Enhanced script to fix missing and invalid website information for agencies
 by extracting URLs from descriptions and fixing common URL issues.
 """
 
-import sqlite3
 import re
 import logging
+from functools import lru_cache
 from urllib.parse import urlparse
 
+from _db import connect_db, ensure_cleanup_indexes
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+# Buffered website updates are flushed every WRITE_BATCH_SIZE agencies
+WRITE_BATCH_SIZE = 1000
+
+# Patterns used for every agency row, compiled once
+_TRAILING_PUNCT = re.compile(r'[.,;]$')
+_FAST_URL = re.compile(r'https?://[^/\s?#\[\]]+(?:[/?#]|$)')
+_DOMAIN_RE = re.compile(r'^[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+# Full URLs, www. domains and bare domain + TLD, matched in a single pass.
+# A bare domain may only start at the beginning of a run of domain characters:
+# a later start in the same run can never match where the first one failed,
+# and retrying it made long descriptions quadratic
+_URL_RE = re.compile(
+    r'https?://[^\s<>"{}|\\^`\[\]]+'
+    r'|www\.[^\s<>"{}|\\^`\[\]]+'
+    r'|(?<![a-zA-Z0-9.-])[a-zA-Z0-9.-]+\.(?:com|pl|es|eu|net|org|biz|info)(?:/[^\s<>"{}|\\^`\[\]]*)*',
+    re.IGNORECASE
+)
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+
+# The URL helpers are pure and many agencies share the same malformed URLs,
+# so their results are memoized
+@lru_cache(maxsize=8192)
 def is_valid_url(url):
     """Check if URL is properly formatted"""
     if not url:
         return False
+    # Fast path for the usual http(s)://host... form; anything else goes through urlparse
+    if _FAST_URL.match(url):
+        return True
     try:
         result = urlparse(url)
         return all([result.scheme, result.netloc])
     except:
         return False
 
+@lru_cache(maxsize=8192)
 def fix_url_format(url):
     """Fix common URL formatting issues"""
     if not url:
@@ -33,12 +61,12 @@ def fix_url_format(url):
     url = url.strip()
 
     # Remove trailing punctuation that might be part of text
-    url = re.sub(r'[.,;]$', '', url)
+    url = _TRAILING_PUNCT.sub('', url)
 
     # If URL doesn't have a scheme, add https://
     if not url.startswith(('http://', 'https://')):
         # Check if it looks like a domain
-        if re.match(r'^[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', url):
+        if _DOMAIN_RE.match(url):
             # If it starts with www., add https://
             if url.startswith('www.'):
                 url = f"https://{url}"
@@ -56,29 +84,33 @@ def extract_urls_from_text(text):
     if not text:
         return []
 
-    urls = []
-
-    # Look for actual URLs (including incomplete ones)
-    url_patterns = [
-        r'https?://[^\s<>"{}|\\^`\[\]]+',  # Full URLs
-        r'www\.[^\s<>"{}|\\^`\[\]]+',      # www. domains
-        r'[a-zA-Z0-9.-]+\.(?:com|pl|es|eu|net|org|biz|info)(?:/[^\s<>"{}|\\^`\[\]]*)*',  # Domain + TLD
-    ]
+    # Found URLs as dict keys: O(1) duplicate checks, insertion order kept
+    urls = {}
+
+    # Look for actual URLs (including incomplete ones); full URLs are
+    # preferred over www. domains, which are preferred over bare domains
+    by_kind = ([], [], [])
+    for url in _URL_RE.findall(text):
+        prefix = url[:8].lower()
+        if prefix.startswith(('http://', 'https://')):
+            by_kind[0].append(url)
+        elif prefix.startswith('www.'):
+            by_kind[1].append(url)
+        else:
+            by_kind[2].append(url)
 
-    for pattern in url_patterns:
-        found_urls = re.findall(pattern, text, re.IGNORECASE)
+    for found_urls in by_kind:
         for url in found_urls:
-            url = re.sub(r'[.,;]$', '', url)  # Remove trailing punctuation
+            url = _TRAILING_PUNCT.sub('', url)  # Remove trailing punctuation
             fixed_url = fix_url_format(url)
-            if fixed_url and fixed_url not in urls:
-                urls.append(fixed_url)
+            if fixed_url:
+                urls.setdefault(fixed_url)
 
     # Look for email addresses and deduce websites from them
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    emails = re.findall(email_pattern, text)
+    emails = _EMAIL_RE.findall(text) if '@' in text else []
 
     for email in emails:
-        domain = email.split('@')[1]
+        domain = email[email.rindex('@') + 1:]
         # Convert domain to potential website
         if not domain.startswith('www.'):
             website = f"https://www.{domain}"
@@ -86,48 +118,59 @@ def extract_urls_from_text(text):
             website = f"https://{domain}"
 
         # Only add if we don't already have a URL
-        if website not in urls:
-            urls.append(website)
+        urls.setdefault(website)
+
+    return list(urls)
 
-    return urls
+def flush_updates(conn, cursor, updates):
+    """Write buffered (new website, id) rows in one transaction and clear the buffer"""
+    with conn:
+        cursor.executemany('''
+            UPDATE agencies
+            SET website = ?, cleanup_status = 'cleaned'
+            WHERE id = ?
+        ''', updates)
+    updates.clear()
 
-def main():
+def main(conn=None):
     """Main function to fix missing and invalid websites"""
     logging.info("Starting enhanced website fixing for all agencies...")
 
     try:
-        conn = sqlite3.connect('agencies.db')
-        cursor = conn.cursor()
+        own_conn = conn is None
+        if own_conn:
+            conn = connect_db()
+        read_cursor = conn.cursor()
+        write_cursor = conn.cursor()
 
-        # Process agencies that haven't been cleaned yet
-        cursor.execute('''
-            SELECT id, name, website, description
-            FROM agencies
-            WHERE cleanup_status != 'cleaned' OR cleanup_status IS NULL
-            ORDER BY id
-        ''')
+        # Process agencies that haven't been cleaned yet; the single IS NOT term
+        # (NULL included) lets SQLite scan the idx_agencies_cleanup_pending index
+        ensure_cleanup_indexes(conn)
+        pending = "FROM agencies WHERE cleanup_status IS NOT 'cleaned'"
 
-        agencies_to_process = cursor.fetchall()
-        logging.info(f"Found {len(agencies_to_process)} agencies to check for website fixes")
+        read_cursor.execute(f"SELECT COUNT(*) {pending}")
+        logging.info(f"Found {read_cursor.fetchone()[0]} agencies to check for website fixes")
+
+        # Rows stream from the cursor; ORDER BY id means every flushed update
+        # targets a row the scan has already passed
+        read_cursor.execute(f"SELECT id, name, website, description {pending} ORDER BY id")
 
         fixed_invalid_count = 0
         extracted_count = 0
 
-        for agency_id, name, website, description in agencies_to_process:
-            updated = False
+        # (new website, id) for the agencies whose website changed
+        updates = []
+
+        for agency_id, name, website, description in read_cursor:
+            new_website = None
 
             # First, fix invalid URLs that are already in the database
             if website and not is_valid_url(website):
                 fixed_url = fix_url_format(website)
                 if fixed_url != website and is_valid_url(fixed_url):
                     logging.info(f"Fixed invalid URL for '{name}': '{website}' -> '{fixed_url}'")
-                    cursor.execute('''
-                        UPDATE agencies
-                        SET website = ?, cleanup_status = 'cleaned'
-                        WHERE id = ?
-                    ''', (fixed_url, agency_id))
+                    new_website = fixed_url
                     fixed_invalid_count += 1
-                    updated = True
 
             # Then, extract URLs from descriptions for agencies with missing websites
             if not website or website == '':
@@ -135,29 +178,23 @@ def main():
 
                 if urls:
                     # Take the first URL found
-                    website = urls[0]
-                    logging.info(f"Extracted website for '{name}': {website}")
+                    new_website = urls[0]
+                    logging.info(f"Extracted website for '{name}': {new_website}")
+                    extracted_count += 1
 
-                    # Update the database
-                    cursor.execute('''
-                        UPDATE agencies
-                        SET website = ?, cleanup_status = 'cleaned'
-                        WHERE id = ?
-                    ''', (website, agency_id))
+            if new_website:
+                updates.append((new_website, agency_id))
+                if len(updates) >= WRITE_BATCH_SIZE:
+                    flush_updates(conn, write_cursor, updates)
 
-                    extracted_count += 1
-                    updated = True
-
-            # Mark as cleaned even if no changes were made
-            if not updated:
-                cursor.execute('''
-                    UPDATE agencies
-                    SET cleanup_status = 'cleaned'
-                    WHERE id = ?
-                ''', (agency_id,))
-
-        conn.commit()
-        conn.close()
+        # Update the database with the remaining batch
+        flush_updates(conn, write_cursor, updates)
+
+        # Mark all remaining agencies as cleaned even if no changes were made
+        with conn:
+            write_cursor.execute("UPDATE agencies SET cleanup_status = 'cleaned' WHERE cleanup_status IS NOT 'cleaned'")
+        if own_conn:
+            conn.close()
 
         logging.info(f"Successfully fixed {fixed_invalid_count} invalid URLs and extracted {extracted_count} new websites")
 
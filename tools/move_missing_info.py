@@ -3,7 +3,16 @@
 Move agencies with missing information to a separate table.
 """
 
-import sqlite3
+from _db import connect_db, ensure_cleanup_indexes
+
+# Agencies with no website, phone, address or description (matches the
+# idx_agencies_missing_info partial index)
+MISSING_INFO_CONDITION = """
+    (website IS NULL OR website = '')
+    AND (phone IS NULL OR phone = '')
+    AND (address IS NULL OR address = '')
+    AND (description IS NULL OR description = '')
+"""
 
 def move_missing_info():
     """Move agencies with no website, phone, address, or description to a new table."""
@@ -11,7 +20,7 @@ def move_missing_info():
     print("=" * 50)
 
     try:
-        conn = sqlite3.connect('agencies.db')
+        conn = connect_db()
         cursor = conn.cursor()
 
         # Create the missing_info table if it doesn't exist
@@ -20,45 +29,41 @@ def move_missing_info():
             SELECT * FROM agencies WHERE 1=0
         """)
 
-        # Select agencies with missing information
-        cursor.execute("""
-            SELECT * FROM agencies
-            WHERE (website IS NULL OR website = '')
-            AND (phone IS NULL OR phone = '')
-            AND (address IS NULL OR address = '')
-            AND (description IS NULL OR description = '')
-        """)
-        missing_info_agencies = cursor.fetchall()
-        moved_count = len(missing_info_agencies)
-
-        if moved_count == 0:
-            print("✅ No agencies with missing information found.")
-            conn.close()
-            return 0
+        ensure_cleanup_indexes(conn)
 
-        print(f"🚚 Found {moved_count} agencies to move.")
+        # Columns added to agencies after missing_info was created (e.g. search
+        # tracking, audit timestamps) are added here too, so nothing is dropped
+        agency_columns = {col[1]: col[2] for col in cursor.execute("PRAGMA table_info(agencies)").fetchall()}
+        missing_columns = [col[1] for col in cursor.execute("PRAGMA table_info(missing_info)").fetchall()]
+        for column, column_type in agency_columns.items():
+            if column not in missing_columns:
+                cursor.execute(f"ALTER TABLE missing_info ADD COLUMN {column} {column_type}")
+                missing_columns.append(column)
 
-        # Get column names from the agencies table
-        cursor.execute("PRAGMA table_info(agencies)")
-        columns = [col[1] for col in cursor.fetchall()]
-        column_names = ", ".join(columns)
-        placeholders = ", ".join(["?" for _ in columns])
+        # Copy and delete inside SQLite in one transaction, so the rows never
+        # pass through Python. Columns are named explicitly, since the two
+        # tables' column order can differ
+        column_names = ", ".join(column for column in missing_columns if column in agency_columns)
+        with conn:
+            cursor.execute(f"""
+                INSERT INTO missing_info ({column_names})
+                SELECT {column_names} FROM agencies
+                WHERE {MISSING_INFO_CONDITION}
+            """)
+            moved_count = cursor.rowcount
 
-        # Insert the selected agencies into the missing_info table
-        cursor.executemany(f"INSERT INTO missing_info ({column_names}) VALUES ({placeholders})", missing_info_agencies)
+            if moved_count > 0:
+                print(f"🚚 Found {moved_count} agencies to move.")
 
-        # Delete the moved agencies from the agencies table
-        cursor.execute("""
-            DELETE FROM agencies
-            WHERE (website IS NULL OR website = '')
-            AND (phone IS NULL OR phone = '')
-            AND (address IS NULL OR address = '')
-            AND (description IS NULL OR description = '')
-        """)
+                # Delete the moved agencies from the agencies table
+                cursor.execute(f"DELETE FROM agencies WHERE {MISSING_INFO_CONDITION}")
 
-        conn.commit()
         conn.close()
 
+        if moved_count == 0:
+            print("✅ No agencies with missing information found.")
+            return 0
+
         print(f"✅ Successfully moved {moved_count} agencies to the 'missing_info' table.")
         return moved_count
 
@@ -3,9 +3,10 @@
 Script to move agencies with no useful information to a separate 'undefined' table
 """
 
-import sqlite3
 import logging
 
+from _db import connect_db, ensure_cleanup_indexes
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -32,21 +33,25 @@ def is_empty_field(field):
     """Check if a field is empty (None, empty string, or whitespace only)"""
     return field is None or str(field).strip() == ""
 
-def main():
+def main(conn=None):
     """Main function to move undefined agencies"""
     logging.info("Starting to move undefined agencies to separate table...")
 
     try:
-        conn = sqlite3.connect('agencies.db')
+        own_conn = conn is None
+        if own_conn:
+            conn = connect_db()
         cursor = conn.cursor()
 
         # Create the undefined table
         cursor.execute(create_undefined_table())
         logging.info("Created 'undefined' table")
+        ensure_cleanup_indexes(conn)
 
         # Find agencies with no useful information that haven't been processed yet
+        # (only the ids; the rows themselves are copied inside SQLite below)
         cursor.execute('''
-            SELECT id, name, type, website, phone, address, description, additional_info, website_status
+            SELECT id
             FROM agencies
             WHERE (website IS NULL OR website = '')
             AND (phone IS NULL OR phone = '')
@@ -55,44 +60,60 @@ def main():
             AND (cleanup_status != 'undefined' OR cleanup_status IS NULL)
         ''')
 
-        undefined_agencies = cursor.fetchall()
-        logging.info(f"Found {len(undefined_agencies)} agencies with no useful information")
+        undefined_ids = [row[0] for row in cursor]
+        logging.info(f"Found {len(undefined_ids)} agencies with no useful information")
 
-        if undefined_agencies:
+        if undefined_ids:
             # Check which agencies are not already in undefined table
-            existing_ids = set()
             cursor.execute('SELECT id FROM undefined')
-            existing_ids = set(row[0] for row in cursor.fetchall())
+            existing_ids = set(row[0] for row in cursor)
 
             # Filter out agencies that are already in undefined
-            new_undefined_agencies = [agency for agency in undefined_agencies if agency[0] not in existing_ids]
+            new_undefined_ids = [agency_id for agency_id in undefined_ids if agency_id not in existing_ids]
+
+            if new_undefined_ids:
+                # Stage the ids in a temp table so the copy and delete below
+                # work on the same fixed set, however many rows there are
+                cursor.execute("DROP TABLE IF EXISTS temp.undefined_ids")
+                cursor.execute("CREATE TEMP TABLE undefined_ids (id INTEGER PRIMARY KEY)")
+                cursor.executemany("INSERT INTO temp.undefined_ids (id) VALUES (?)",
+                                   ((agency_id,) for agency_id in new_undefined_ids))
+
+                # Show some examples
+                cursor.execute('''
+                    SELECT id, name FROM agencies
+                    WHERE id IN (SELECT id FROM temp.undefined_ids)
+                    ORDER BY id
+                    LIMIT 5
+                ''')
+                examples = cursor.fetchall()
 
-            if new_undefined_agencies:
                 # Insert into undefined table (without preserving original IDs to avoid conflicts)
-                cursor.executemany('''
+                cursor.execute('''
                     INSERT INTO undefined (name, type, website, phone, address, description, additional_info, website_status)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', [agency[1:] for agency in new_undefined_agencies])  # Skip the ID field
-
-                # Get the IDs to delete from agencies table
-                undefined_ids = [agency[0] for agency in new_undefined_agencies]
+                    SELECT name, type, website, phone, address, description, additional_info, website_status
+                    FROM agencies
+                    WHERE id IN (SELECT id FROM temp.undefined_ids)
+                    ORDER BY id
+                ''')
 
                 # Delete from agencies table
-                cursor.execute(f'''
+                cursor.execute('''
                     DELETE FROM agencies
-                    WHERE id IN ({','.join('?' * len(undefined_ids))})
-                ''', undefined_ids)
+                    WHERE id IN (SELECT id FROM temp.undefined_ids)
+                ''')
+                cursor.execute("DROP TABLE temp.undefined_ids")
 
-                logging.info(f"Moved {len(new_undefined_agencies)} agencies to 'undefined' table")
+                logging.info(f"Moved {len(new_undefined_ids)} agencies to 'undefined' table")
 
-                # Show some examples
-                for agency in new_undefined_agencies[:5]:
-                    logging.info(f"Moved: '{agency[1]}' (ID: {agency[0]})")
+                for agency_id, name in examples:
+                    logging.info(f"Moved: '{name}' (ID: {agency_id})")
             else:
                 logging.info("No new agencies to move (all candidates already in undefined table)")
 
         conn.commit()
-        conn.close()
+        if own_conn:
+            conn.close()
 
         logging.info("Successfully completed moving undefined agencies")
 
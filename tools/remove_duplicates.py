@@ -3,10 +3,11 @@
 Script to identify and remove duplicate agencies from the database
 """
 
-import sqlite3
 import logging
 from collections import defaultdict
 
+from _db import connect_db
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -27,15 +28,18 @@ def calculate_completeness_score(agency):
 
     return score
 
-def find_duplicates():
+def find_duplicates(conn=None):
     """Find duplicate agencies based on name similarity"""
-    conn = sqlite3.connect('agencies.db')
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
     cursor = conn.cursor()
 
     # Get all agencies (process recent entries first)
     cursor.execute('SELECT id, name, type, website, phone, address, description, additional_info, website_status FROM agencies ORDER BY id DESC')
     agencies = cursor.fetchall()
-    conn.close()
+    if own_conn:
+        conn.close()
 
     # Group by normalized name (lowercase, remove extra spaces)
     name_groups = defaultdict(list)
@@ -55,18 +59,20 @@ def find_duplicates():
 
     return duplicates
 
-def remove_duplicates():
+def remove_duplicates(conn=None):
     """Remove duplicate agencies, keeping the most complete one"""
     logging.info("Starting duplicate removal process...")
 
-    duplicates = find_duplicates()
+    duplicates = find_duplicates(conn)
     total_duplicates_removed = 0
 
     if not duplicates:
         logging.info("No duplicates found")
         return 0
 
-    conn = sqlite3.connect('agencies.db')
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db()
     cursor = conn.cursor()
 
     for normalized_name, group in duplicates:
@@ -95,14 +101,15 @@ def remove_duplicates():
                 logging.info(f"  Removed duplicate ID: {remove_id}")
 
     conn.commit()
-    conn.close()
+    if own_conn:
+        conn.close()
 
     logging.info(f"Successfully removed {total_duplicates_removed} duplicate entries")
     return total_duplicates_removed
 
-def main():
+def main(conn=None):
     """Main function"""
-    duplicates = find_duplicates()
+    duplicates = find_duplicates(conn)
 
     if not duplicates:
         logging.info("No duplicates found in the database")
@@ -119,7 +126,7 @@ def main():
     print("This will keep the most complete entry from each group and remove the rest.")
 
     # For now, just proceed automatically
-    removed = remove_duplicates()
+    removed = remove_duplicates(conn)
     print(f"\nRemoved {removed} duplicate entries.")
 
 if __name__ == '__main__':
@@ -18,28 +18,49 @@ Usage:
     python tools/run_full_cleanup.py
 """
 
-import subprocess
-import sys
+import io
+import os
 import time
+import logging
+import importlib
+import contextlib
 from pathlib import Path
 
-def run_cleanup_tool(tool_name, description):
-    """Run a cleanup tool and report results"""
+from _db import connect_db, ensure_cleanup_indexes
+from export_agencies import export_agencies_json
+
+def run_cleanup_tool(conn, tool_name, description):
+    """Run a cleanup tool on the shared connection and report results"""
     print(f"\n🧹 Running {tool_name}...")
     print(f"   {description}")
 
     try:
         start_time = time.time()
-        result = subprocess.run([sys.executable, f'tools/{tool_name}.py'],
-                              capture_output=True, text=True, cwd=Path(__file__).parent.parent)
+
+        # Run the tool's main() in this process instead of a fresh interpreter.
+        # Its prints are captured for the summary and INFO logging is muted
+        # for the duration, as the captured subprocess used to be.
+        # All tools share one WAL connection. The tools commit (and mostly
+        # catch their own errors) themselves; the with block only commits
+        # whatever a tool leaves open, or rolls it back if the tool raises
+        output = io.StringIO()
+        logging.disable(logging.INFO)
+        try:
+            with conn, contextlib.redirect_stdout(output):
+                importlib.import_module(tool_name).main(conn)
+            error = None
+        except (Exception, SystemExit) as e:
+            error = e
+        finally:
+            logging.disable(logging.NOTSET)
 
         end_time = time.time()
         duration = end_time - start_time
 
-        if result.returncode == 0:
+        if error is None:
             print(f"   ✅ {tool_name} completed successfully ({duration:.1f}s)")
             # Print the last few lines of output (usually the summary)
-            output_lines = result.stdout.strip().split('\n')
+            output_lines = output.getvalue().strip().split('\n')
             if output_lines:
                 # Show last 2-3 lines which usually contain the summary
                 summary_lines = [line for line in output_lines[-3:] if line.strip()]
@@ -48,20 +69,14 @@ def run_cleanup_tool(tool_name, description):
                         print(f"      📊 {line.strip()}")
         else:
             print(f"   ⚠️ {tool_name} completed with warnings ({duration:.1f}s)")
-            if result.stderr:
-                error_lines = result.stderr.strip().split('\n')[-2:]  # Last 2 lines of errors
-                for line in error_lines:
-                    if line.strip():
-                        print(f"      ⚠️ {line.strip()}")
+            print(f"      ⚠️ {type(error).__name__}: {error}")
 
     except Exception as e:
         print(f"   💥 Error running {tool_name}: {e}")
 
-def get_database_stats():
+def get_database_stats(conn):
     """Get current database statistics"""
     try:
-        import sqlite3
-        conn = sqlite3.connect('agencies.db')
         cursor = conn.cursor()
 
         # Get counts
@@ -75,8 +90,6 @@ def get_database_stats():
         cursor.execute("SELECT type, COUNT(*) FROM agencies GROUP BY type ORDER BY COUNT(*) DESC")
         type_breakdown = cursor.fetchall()
 
-        conn.close()
-
         return agencies_count, undefined_count, type_breakdown
 
     except Exception as e:
@@ -88,15 +101,19 @@ def main():
     print("🚀 Starting Comprehensive Data Cleanup")
     print("=" * 50)
 
+    # The tools open agencies.db relative to the repository root
+    os.chdir(Path(__file__).parent.parent)
+
+    # One connection (WAL PRAGMAs set once) is shared by every cleanup tool
+    conn = connect_db()
+
     # Mark all agencies as pending cleanup initially
     try:
-        import sqlite3
-        conn = sqlite3.connect('agencies.db')
         cursor = conn.cursor()
         cursor.execute("UPDATE agencies SET cleanup_status = 'pending' WHERE cleanup_status IS NULL OR cleanup_status = ''")
         pending_count = cursor.rowcount
         conn.commit()
-        conn.close()
+        ensure_cleanup_indexes(conn)
         if pending_count > 0:
             print(f"📝 Marked {pending_count} agencies as pending cleanup")
     except Exception as e:
@@ -104,7 +121,7 @@ def main():
 
     # Get initial stats
     print("📊 Initial Database Status:")
-    initial_agencies, initial_undefined, initial_types = get_database_stats()
+    initial_agencies, initial_undefined, initial_types = get_database_stats(conn)
     print(f"   Agencies table: {initial_agencies} entries")
     print(f"   Undefined table: {initial_undefined} entries")
     print(f"   Total: {initial_agencies + initial_undefined} entries")
@@ -129,11 +146,11 @@ def main():
 
     # Run all cleanup tools
     for tool_name, description in cleanup_tools:
-        run_cleanup_tool(tool_name, description)
+        run_cleanup_tool(conn, tool_name, description)
 
     # Get final stats
     print("\n📊 Final Database Status:")
-    final_agencies, final_undefined, final_types = get_database_stats()
+    final_agencies, final_undefined, final_types = get_database_stats(conn)
     print(f"   Agencies table: {final_agencies} entries")
     print(f"   Undefined table: {final_undefined} entries")
     print(f"   Total: {final_agencies + final_undefined} entries")
@@ -143,6 +160,8 @@ def main():
         for type_name, count in final_types:
             print(f"     - {type_name}: {count}")
 
+    conn.close()
+
     # Summary
     print("\n🎉 Cleanup Complete!")
     print("=" * 50)
@@ -157,12 +176,8 @@ def main():
     if agencies_change != 0 or undefined_change != 0:
         print("\n� Updating web interface data...")
         try:
-            result = subprocess.run(['bash', 'tools/update_data.sh'],
-                                  capture_output=True, text=True, cwd=Path(__file__).parent.parent)
-            if result.returncode == 0:
-                print("   ✅ Web interface data updated successfully")
-            else:
-                print("   ⚠️ Web interface update had issues")
+            export_agencies_json()
+            print("   ✅ Web interface data updated successfully")
         except Exception as e:
             print(f"   💥 Error updating web interface: {e}")
 
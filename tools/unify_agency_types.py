@@ -34,19 +34,14 @@ def unify_agency_types():
 
         print(f"\n🔄 Updating {count_to_update} agencies from 'both'/'Spain&Poland' to 'Spain and Poland'...")
 
-        # Update the types
-        cursor.execute("""
-            UPDATE agencies
-            SET type = 'Spain and Poland'
-            WHERE type IN ('both', 'Spain&Poland')
-        """)
-
-        # Add update note to additional_info
+        # Update the types and add the note to additional_info in one pass, so
+        # only the rows actually unified get the note
         update_note = f" | Type unified to 'Spain and Poland' on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
         cursor.execute("""
             UPDATE agencies
-            SET additional_info = COALESCE(additional_info, '') || ?
-            WHERE type = 'Spain and Poland'
+            SET type = 'Spain and Poland',
+                additional_info = COALESCE(additional_info, '') || ?
+            WHERE type IN ('both', 'Spain&Poland')
         """, (update_note,))
 
         conn.commit()
@@ -95,6 +90,8 @@ def update_website_statuses():
 
         # For now, we'll mark them as 'needs_validation' to trigger re-checking
         # In a full implementation, we'd run the website validator here
+        # One timestamp for the whole batch
+        status_note = f" | Website status set to needs_validation for re-checking on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
         updated_count = 0
         for agency_id, name, website, status in agencies_to_check:
             cursor.execute("""
@@ -102,7 +99,7 @@ def update_website_statuses():
                 SET website_status = 'needs_validation',
                     additional_info = additional_info || ?
                 WHERE id = ?
-            """, (f" | Website status set to needs_validation for re-checking on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", agency_id))
+            """, (status_note, agency_id))
             updated_count += 1
 
         conn.commit()
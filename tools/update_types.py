@@ -4,16 +4,34 @@ Script to update the type field for gemini_discovered agencies
 to either 'polish' or 'marbella' based on phone country codes and website domains.
 """
 
-import sqlite3
 import re
 import logging
 
+from _db import connect_db, ensure_lookup_indexes
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+# Polish cities recognised in addresses
+POLISH_CITIES = (
+    'warsaw', 'krakow', 'lodz', 'wroclaw', 'poznan', 'gdansk', 'szczecin',
+    'bydgoszcz', 'lublin', 'katowice', 'bialystok', 'gdynia', 'czestochowa',
+    'radom', 'sosnowiec', 'torun', 'kielce', 'rzeszow', 'gliwice', 'zabrze',
+    'olsztyn', 'bielsko-biala', 'bytom', 'zielona gora', 'rybnik', 'ruda slaska',
+    'opole', 'tichy', 'gorzow wielkopolski', 'dabrowa gornicza', 'plock', 'elblag',
+    'walbrzych', 'tarnow', 'chorzow', 'koscian', 'kalisz', 'legnica', 'grudziadz',
+    'slupsk', 'jastrzebie-zdroj', 'nowy sacz', 'jaworzno', 'jelenia gora',
+    'ostrow mazowiecka', 'swidnica', 'stalowa wola', 'piekary slaskie', 'lubin',
+    'zamosc',
+)
+
+# 'poland' or any Polish city, found in one regex scan instead of one
+# substring search per city
+_POLISH_ADDRESS_RE = re.compile('|'.join(map(re.escape, ('poland',) + POLISH_CITIES)))
+
 def determine_agency_type(name, website, phone, address, description):
     """Determine if agency is Polish, Marbella-based, both, or keep as gemini_discovered"""
 
@@ -37,7 +55,7 @@ def determine_agency_type(name, website, phone, address, description):
     # Check address for location indicators
     if address:
         address_lower = address.lower()
-        if 'poland' in address_lower or any(city in address_lower for city in ['warsaw', 'krakow', 'lodz', 'wroclaw', 'poznan', 'gdansk', 'szczecin', 'bydgoszcz', 'lublin', 'katowice', 'bialystok', 'gdynia', 'czestochowa', 'radom', 'sosnowiec', 'torun', 'kielce', 'rzeszow', 'gliwice', 'zabrze', 'olsztyn', 'bielsko-biala', 'bytom', 'zielona gora', 'rybnik', 'ruda slaska', 'opole', 'tichy', 'gorzow wielkopolski', 'dabrowa gornicza', 'plock', 'elblag', 'walbrzych', 'tarnow', 'chorzow', 'koscian', 'kalisz', 'legnica', 'grudziadz', 'slupsk', 'jastrzebie-zdroj', 'nowy sacz', 'jaworzno', 'jelenia gora', 'ostrow mazowiecka', 'swidnica', 'stalowa wola', 'piekary slaskie', 'lubin', 'zamosc']):
+        if _POLISH_ADDRESS_RE.search(address_lower):
             indicators['polish'] += 1
         elif 'spain' in address_lower or 'marbella' in address_lower or 'costa del sol' in address_lower or 'malaga' in address_lower:
             indicators['marbella'] += 1
@@ -72,12 +90,15 @@ def determine_agency_type(name, website, phone, address, description):
         # No clear indicators found
         return 'gemini_discovered'
 
-def main():
+def main(conn=None):
     """Main function to update agency types"""
     logging.info("Starting type classification for gemini_discovered agencies...")
 
     try:
-        conn = sqlite3.connect('agencies.db')
+        own_conn = conn is None
+        if own_conn:
+            conn = connect_db()
+        ensure_lookup_indexes(conn)
         cursor = conn.cursor()
 
         # First, reset all previously classified agencies back to gemini_discovered
@@ -89,44 +110,36 @@ def main():
         reset_count = cursor.rowcount
         logging.info(f"Reset {reset_count} agencies back to 'gemini_discovered' for reclassification")
 
-        # Get all gemini_discovered agencies
+        cursor.execute("SELECT COUNT(*) FROM agencies WHERE type = 'gemini_discovered'")
+        logging.info(f"Found {cursor.fetchone()[0]} gemini_discovered agencies to classify")
+
+        # Classify inside SQLite via a Python UDF, so all agencies are updated
+        # in one statement instead of a SELECT plus an UPDATE per row
+        conn.create_function("agency_type", 5, determine_agency_type, deterministic=True)
         cursor.execute('''
-            SELECT id, name, website, phone, address, description
-            FROM agencies
+            UPDATE agencies
+            SET type = agency_type(name, website, phone, address, description)
             WHERE type = 'gemini_discovered'
-            ORDER BY id
+            RETURNING name, type, phone, website
         ''')
 
-        agencies = cursor.fetchall()
-        logging.info(f"Found {len(agencies)} gemini_discovered agencies to classify")
-
         updated_count = 0
-
-        for agency_id, name, website, phone, address, description in agencies:
-            new_type = determine_agency_type(name, website, phone, address, description)
-
+        for name, new_type, phone, website in cursor:
             logging.info(f"Classifying '{name}' as '{new_type}' (phone: {phone}, website: {website})")
-
-            # Update the database
-            cursor.execute('''
-                UPDATE agencies
-                SET type = ?
-                WHERE id = ?
-            ''', (new_type, agency_id))
-
             updated_count += 1
 
         conn.commit()
-        conn.close()
+
+        # Refresh planner statistics after the bulk update
+        cursor.execute("ANALYZE agencies")
 
         logging.info(f"Successfully updated {updated_count} agencies with proper type classification")
 
         # Show summary
-        conn = sqlite3.connect('agencies.db')
-        cursor = conn.cursor()
         cursor.execute("SELECT type, COUNT(*) FROM agencies GROUP BY type ORDER BY COUNT(*) DESC")
         results = cursor.fetchall()
-        conn.close()
+        if own_conn:
+            conn.close()
 
         logging.info("Final classification summary:")
         for agency_type, count in results:
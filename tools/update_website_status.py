@@ -21,39 +21,24 @@ def update_types_based_on_website_status():
         conn = sqlite3.connect('agencies.db')
         cursor = conn.cursor()
 
-        # Get agencies with website status information (process recent entries first)
+        cursor.execute("SELECT COUNT(*) FROM agencies WHERE website_status IS NOT NULL AND website_status != ''")
+        logging.info(f"Found {cursor.fetchone()[0]} agencies with website status information")
+
+        # Mark agencies with inactive/broken websites as 'inactive' in a single
+        # statement; rows already marked inactive are left untouched
         cursor.execute('''
-            SELECT id, name, type, website_status
-            FROM agencies
-            WHERE website_status IS NOT NULL AND website_status != ''
-            ORDER BY id DESC
+            UPDATE agencies
+            SET type = 'inactive'
+            WHERE type IS NOT 'inactive'
+            AND website_status IN ('inactive', 'connection_error', 'timeout', 'ssl_error', 'http_405', 'http_403', 'http_400', 'upgraded_to_https')
+            RETURNING name, website_status
         ''')
 
-        agencies = cursor.fetchall()
-        logging.info(f"Found {len(agencies)} agencies with website status information")
-
         updated_count = 0
-        inactive_count = 0
-
-        for agency_id, name, current_type, website_status in agencies:
-            new_type = current_type
-
-            # Mark agencies with inactive/broken websites as 'inactive'
-            if website_status in ('inactive', 'connection_error', 'timeout', 'ssl_error', 'http_405', 'http_403', 'http_400', 'upgraded_to_https'):
-                if current_type != 'inactive':
-                    new_type = 'inactive'
-                    inactive_count += 1
-                    logging.info(f"Marking '{name}' as inactive (website status: {website_status})")
-                # Keep as inactive if already marked
-
-            # Only update if type changed
-            if new_type != current_type:
-                cursor.execute('''
-                    UPDATE agencies
-                    SET type = ?
-                    WHERE id = ?
-                ''', (new_type, agency_id))
-                updated_count += 1
+        for name, website_status in cursor:
+            logging.info(f"Marking '{name}' as inactive (website status: {website_status})")
+            updated_count += 1
+        inactive_count = updated_count
 
         conn.commit()
         conn.close()
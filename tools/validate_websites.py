@@ -3,11 +3,19 @@
 Script to validate website URLs for agencies by checking if they are accessible
 """
 
-import sqlite3
+import re
 import requests
 import logging
 import time
-from urllib.parse import urlparse
+import threading
+from collections import deque, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, urlsplit
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from _db import connect_db
+from enhanced_website_validator import HEAD_REJECTED_STATUSES, dns_cache, prefetch_dns
 
 # Configure logging
 logging.basicConfig(
@@ -15,28 +23,129 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+# Website checks are network-bound, so check several agencies at once. The
+# number in flight adapts (AIMD) between the min and max: once per round it
+# grows by one while checks stay under the target latency, and halves when the
+# round looks overloaded (most checks failing, or successful checks taking
+# more than twice the target). A single dead site is normal here and doesn't count
+VALIDATION_CONCURRENCY = 16
+VALIDATION_MIN_CONCURRENCY = 2
+VALIDATION_MAX_CONCURRENCY = 64
+TARGET_LATENCY = 2.0  # seconds
+OVERLOAD_FAILURE_SHARE = 0.5
+
+# Statuses that suggest we (or the network) are being throttled
+THROTTLED_STATUSES = ('timeout', 'connection_error', 'server_error', 'http_429')
+
+# Status updates are written in one transaction per batch
+WRITE_BATCH_SIZE = 500
+
+# Minimum spacing between requests to the same host, in seconds; different
+# hosts are not throttled against each other
+PER_HOST_DELAY = 0.5
+
+# Next free request slot per host, shared by the worker threads
+_host_slots = {}
+_host_slots_lock = threading.Lock()
+
+# Plain http(s) URLs with an ASCII host, accepted without building a ParseResult;
+# anything else goes through urlparse
+_SIMPLE_URL_RE = re.compile(r"https?://[\w.:@%+~!$&'()*,;=-]+(?:[/?#]|$)", re.ASCII)
+
+# One keep-alive session shared by all workers, so repeated hosts reuse
+# their TCP/TLS connection instead of handshaking for every check
+_session = requests.Session()
+_session.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+})
+_adapter = HTTPAdapter(pool_connections=VALIDATION_MAX_CONCURRENCY, pool_maxsize=VALIDATION_MAX_CONCURRENCY,
+                       max_retries=Retry(total=0))
+_session.mount('https://', _adapter)
+_session.mount('http://', _adapter)
+
 def is_valid_url(url):
     """Check if URL is properly formatted"""
     try:
+        if _SIMPLE_URL_RE.match(url):
+            return True
         result = urlparse(url)
         return all([result.scheme, result.netloc])
     except:
         return False
 
+def wait_for_host(url):
+    """Sleep until PER_HOST_DELAY has passed since the previous request to url's host"""
+    host = urlparse(url).netloc.lower()
+    # Reserve the next slot under the lock, then sleep outside it so other hosts aren't blocked
+    with _host_slots_lock:
+        now = time.monotonic()
+        slot = max(now, _host_slots.get(host, 0) + PER_HOST_DELAY)
+        _host_slots[host] = slot
+    if slot > now:
+        time.sleep(slot - now)
+
+class AdaptiveConcurrency:
+    """Concurrency limit with additive increase / multiplicative decrease"""
+
+    def __init__(self, initial=VALIDATION_CONCURRENCY, minimum=VALIDATION_MIN_CONCURRENCY,
+                 maximum=VALIDATION_MAX_CONCURRENCY, target_latency=TARGET_LATENCY,
+                 overload_failure_share=OVERLOAD_FAILURE_SHARE):
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.overload_failure_share = overload_failure_share
+        self.active = 0
+        self.samples = deque(maxlen=64)  # (latency, ok) of recent checks
+        self.since_adjust = 0
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        """Block until fewer than limit checks are in flight"""
+        with self.condition:
+            while self.active >= self.limit:
+                self.condition.wait()
+            self.active += 1
+
+    def release(self, latency, ok):
+        """Finish a check and adjust the limit from its outcome"""
+        with self.condition:
+            self.active -= 1
+            self.samples.append((latency, ok))
+            self.since_adjust += 1
+
+            if self.since_adjust >= self.limit:
+                # Adjust once per "round" of limit completions, judged on the
+                # recent window rather than on any one site
+                ok_latencies = [latency for latency, sample_ok in self.samples if sample_ok]
+                failure_share = 1 - len(ok_latencies) / len(self.samples)
+                average = sum(ok_latencies) / len(ok_latencies) if ok_latencies else 0
+
+                if failure_share > self.overload_failure_share or average > 2 * self.target_latency:
+                    self.limit = max(self.minimum, self.limit // 2)
+                    self.samples.clear()
+                elif average <= self.target_latency:
+                    self.limit = min(self.maximum, self.limit + 1)
+                self.since_adjust = 0
+
+            self.condition.notify_all()
+
 def check_website_status(url, timeout=10):
     """Check if website is accessible and returns a valid response"""
     if not url or not is_valid_url(url):
         return "invalid_url"
 
     try:
-        # Set headers to mimic a browser
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
+        response = _session.head(url, timeout=timeout, allow_redirects=True)
 
-        response = requests.head(url, timeout=timeout, headers=headers, allow_redirects=True)
+        # Confirm HEAD rejections with a streamed GET for a single byte,
+        # closed before the body is read
+        if response.status_code in HEAD_REJECTED_STATUSES:
+            with _session.get(url, timeout=timeout, allow_redirects=True, stream=True,
+                              headers={'Range': 'bytes=0-0'}) as response:
+                pass
 
-        if response.status_code == 200:
+        if response.status_code in (200, 206):
             return "active"
         elif response.status_code in [301, 302, 303, 307, 308]:
             return "redirect"
@@ -56,12 +165,44 @@ def check_website_status(url, timeout=10):
     except Exception as e:
         return f"unknown_error_{str(e)[:20]}"
 
+def normalize_url(url):
+    """Key for URLs that must give the same check result: host lower-cased, fragment dropped"""
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    return parts._replace(netloc=parts.netloc.lower(), fragment='').geturl()
+
+def check_agencies(agencies, concurrency):
+    """Check the (valid) website shared by (id, name, website) rows once, returns (agencies, status)"""
+    website = agencies[0][2]
+
+    # Wait for the host before taking a slot, so slots only cover network time
+    wait_for_host(website)
+
+    concurrency.acquire()
+    start = time.monotonic()
+    status = check_website_status(website)
+    concurrency.release(time.monotonic() - start, status not in THROTTLED_STATUSES)
+
+    return agencies, status
+
+def flush_statuses(conn, cursor, pending):
+    """Write buffered (status, id) rows in one transaction and clear the buffer"""
+    with conn:
+        cursor.executemany('''
+            UPDATE agencies
+            SET website_status = ?
+            WHERE id = ?
+        ''', pending)
+    pending.clear()
+
 def main():
     """Main function to validate websites"""
     logging.info("Starting website validation for all agencies...")
 
     try:
-        conn = sqlite3.connect('agencies.db')
+        conn = connect_db()
         cursor = conn.cursor()
 
         # Get all agencies with websites
@@ -77,29 +218,55 @@ def main():
 
         updated_count = 0
         status_counts = {}
+        pending = []
+
+        # Malformed URLs are marked invalid_url in one batch without taking a
+        # check slot; agencies sharing a valid website (e.g. franchise
+        # branches) are checked once
+        agencies_by_url = defaultdict(list)
+        for agency in agencies:
+            if is_valid_url(agency[2]):
+                agencies_by_url[normalize_url(agency[2])].append(agency)
+            else:
+                logging.info(f"Checked '{agency[1]}': {agency[2]} -> invalid_url")
+                pending.append(("invalid_url", agency[0]))
+
+        if pending:
+            status_counts["invalid_url"] = len(pending)
+            updated_count += len(pending)
+            flush_statuses(conn, cursor, pending)
+        logging.info(f"Checking {len(agencies_by_url)} distinct websites")
+
+        # Resolve every distinct host up front through the validator's TTL DNS
+        # cache, so lookups are off the critical path of the checks; one lookup
+        # per host, since replicas would multiply DNS traffic over the whole table
+        with dns_cache():
+            prefetch_dns([group[0][2] for group in agencies_by_url.values()], replicate=False)
 
-        for agency_id, name, website in agencies:
-            status = check_website_status(website)
-            status_counts[status] = status_counts.get(status, 0) + 1
+            # Checks run concurrently; results come back in order of first
+            # appearance and the database is only written from this thread
+            concurrency = AdaptiveConcurrency()
+            with ThreadPoolExecutor(max_workers=VALIDATION_MAX_CONCURRENCY) as executor:
+                for group, status in executor.map(lambda group: check_agencies(group, concurrency), agencies_by_url.values()):
+                    for agency_id, name, website in group:
+                        status_counts[status] = status_counts.get(status, 0) + 1
 
-            logging.info(f"Checked '{name}': {website} -> {status}")
+                        logging.info(f"Checked '{name}': {website} -> {status}")
 
-            # Update the database with website status
-            cursor.execute('''
-                UPDATE agencies
-                SET website_status = ?
-                WHERE id = ?
-            ''', (status, agency_id))
+                        # Update the database with website status
+                        pending.append((status, agency_id))
+                        if len(pending) >= WRITE_BATCH_SIZE:
+                            flush_statuses(conn, cursor, pending)
 
-            updated_count += 1
+                        updated_count += 1
 
-            # Rate limiting to be respectful to websites
-            time.sleep(0.5)
+        flush_statuses(conn, cursor, pending)
 
-        conn.commit()
+        # Refresh planner statistics after the bulk update
+        cursor.execute("ANALYZE agencies")
         conn.close()
 
-        logging.info(f"Successfully validated {updated_count} websites")
+        logging.info(f"Successfully validated {updated_count} websites (final concurrency: {concurrency.limit})")
 
         # Show summary
         logging.info("Website validation summary:")
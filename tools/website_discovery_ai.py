@@ -6,22 +6,33 @@ Uses Google Gemini AI to search for websites of agencies that don't have them.
 Integrates with the enhanced website validator for comprehensive discovery.
 """
 
-import sqlite3
+import re
 import logging
 import time
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 
+import _ai_cache
+from _db import connect_db, ensure_lookup_indexes
+
 # Import Gemini integration
 try:
-    from gemini_agency_finder import GeminiAgencyFinder
+    from gemini_agency_finder import GeminiAgencyFinder, RateLimiter
 except ImportError:
     # Fallback if not available
     class GeminiAgencyFinder:
         def __init__(self):
             self.api_key = None
         def run_gemini_prompt(self, prompt, use_web_search=True):
-            return "AI search not available - Gemini API key not configured"
+            # No answer, like a failed API call, so nothing gets cached
+            logging.warning("AI search not available - Gemini API key not configured")
+            return None
+
+    class RateLimiter:
+        def acquire(self):
+            pass
 
 # Configure logging
 logging.basicConfig(
@@ -29,10 +40,41 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+# URLs in free-text AI responses, used when the response isn't valid JSON
+_URL_RE = re.compile(r'https?://[^\s<>"{}|\\^`\[\]]+')
+
+# Agencies searched at once; the shared rate limiter keeps the combined
+# prompts within the Gemini requests-per-minute quota
+DISCOVERY_CONCURRENCY = 4
+
+# Discovered websites are written and committed every WRITE_BATCH_SIZE agencies
+WRITE_BATCH_SIZE = 50
+
+DISCOVERY_UPDATE_SQL = """
+    UPDATE agencies
+    SET website = ?,
+        website_status = 'ai_discovered',
+        alternative_urls = ?,
+        url_validation_date = datetime('now'),
+        additional_info = additional_info || ?
+    WHERE id = ?
+"""
+
 class AIWebsiteDiscoverer:
-    def __init__(self):
+    def __init__(self, db_path='agencies.db'):
         self.finder = GeminiAgencyFinder()
         self.max_prompts_per_agency = 2  # Limit API calls per agency
+        self.rate_limiter = RateLimiter()
+
+        # Answers for agencies already searched are reused from the ai_cache
+        # table; agencies are searched from worker threads, so access is locked
+        self.cache_conn = connect_db(db_path, check_same_thread=False)
+        self.cache_lock = threading.Lock()
+        _ai_cache.ensure_table(self.cache_conn)
+
+    def close(self):
+        """Close the cache connection"""
+        self.cache_conn.close()
 
     def discover_website_for_agency(self, agency_name: str, city: str = None, country: str = "Poland") -> List[Dict]:
         """
@@ -42,7 +84,15 @@ class AIWebsiteDiscoverer:
         if not agency_name or not agency_name.strip():
             return []
 
+        cache_key = _ai_cache.make_key('discovery', agency_name, city, country)
+        with self.cache_lock:
+            cached = _ai_cache.get(self.cache_conn, cache_key)
+        if cached is not None:
+            logging.info(f"Using cached discovery results for {agency_name}")
+            return cached
+
         discovered_websites = []
+        answered = False
 
         # Create targeted search prompts
         prompts = self._generate_search_prompts(agency_name, city, country)
@@ -50,17 +100,21 @@ class AIWebsiteDiscoverer:
         for prompt in prompts[:self.max_prompts_per_agency]:
             logging.info(f"Searching for website: {agency_name} in {city or 'unknown city'}")
 
+            self.rate_limiter.acquire()
             response = self.finder.run_gemini_prompt(prompt, use_web_search=True)
             if response:
+                answered = True
                 websites = self._extract_websites_from_response(response, agency_name)
                 discovered_websites.extend(websites)
 
-                # Rate limiting
-                time.sleep(2)
-
         # Remove duplicates and rank by confidence
         unique_websites = self._deduplicate_and_rank(agency_name, discovered_websites)
 
+        # Only cache real answers; a failed API call returns no response
+        if answered:
+            with self.cache_lock:
+                _ai_cache.put(self.cache_conn, cache_key, unique_websites)
+
         logging.info(f"Discovered {len(unique_websites)} potential websites for {agency_name}")
         return unique_websites
 
@@ -128,9 +182,7 @@ Return ONLY JSON array:
 
         except json.JSONDecodeError:
             # Fallback: extract URLs from text response
-            import re
-            url_pattern = r'https?://[^\s<>"{}|\\^`\[\]]+'
-            found_urls = re.findall(url_pattern, response)
+            found_urls = _URL_RE.findall(response)
 
             for url in found_urls[:3]:  # Limit to first 3 URLs
                 websites.append({
@@ -151,6 +203,16 @@ Return ONLY JSON array:
         # Sort by confidence first
         websites.sort(key=lambda x: x.get('confidence', 0), reverse=True)
 
+        # Domain fragments that suggest an official site; the same for every
+        # candidate, so built once
+        name_lower = agency_name.lower()
+        domain_indicators = [
+            name_lower.replace(' ', '').replace('nieruchomości', '').replace('agency', ''),
+            name_lower.split()[0] if agency_name.split() else '',
+            'nieruchomosci', 'property', 'realestate', 'immobilien'
+        ]
+        domain_indicators = [indicator for indicator in domain_indicators if len(indicator) > 2]
+
         for website in websites:
             url = website['url'].lower().strip()
 
@@ -162,16 +224,9 @@ Return ONLY JSON array:
             if not url.startswith(('http://', 'https://')):
                 continue
 
-            # Boost confidence for official-looking domains
-            domain_indicators = [
-                agency_name.lower().replace(' ', '').replace('nieruchomości', '').replace('agency', ''),
-                agency_name.lower().split()[0] if agency_name.split() else '',
-                'nieruchomosci', 'property', 'realestate', 'immobilien'
-            ]
-
-            url_lower = url.lower()
+            # Boost confidence for official-looking domains (url is already lower-case)
             for indicator in domain_indicators:
-                if indicator and len(indicator) > 2 and indicator in url_lower:
+                if indicator in url:
                     website['confidence'] = min(1.0, website.get('confidence', 0.5) + 0.2)
                     break
 
@@ -180,61 +235,63 @@ Return ONLY JSON array:
 
         return unique_websites[:5]  # Return top 5 most relevant
 
-def update_agency_with_discovered_website(agency_id: int, discovered_websites: List[Dict]):
-    """Update agency record with AI-discovered websites"""
+def discovery_update_params(agency_id: int, discovered_websites: List[Dict]) -> tuple:
+    """Return the DISCOVERY_UPDATE_SQL parameters for an agency's discovered websites"""
+    # Take the highest confidence website as primary
+    best_website = discovered_websites[0]
+
+    # Prepare alternatives (all discovered websites)
+    alternatives = []
+    for i, website in enumerate(discovered_websites):
+        alternatives.append({
+            'url': website['url'],
+            'confidence': website.get('confidence', 0.5),
+            'reason': website.get('reason', 'AI discovered'),
+            'source': website.get('source', 'AI search'),
+            'priority': i + 1
+        })
+
+    return (
+        best_website['url'],
+        json.dumps(alternatives),
+        f" | Website discovered via AI search on {time.strftime('%Y-%m-%d %H:%M:%S')}",
+        agency_id
+    )
+
+def update_agency_with_discovered_website(agency_id: int, discovered_websites: List[Dict], conn=None):
+    """Update agency record with AI-discovered websites (on conn if given, committed by the caller)"""
     if not discovered_websites:
         return False
 
+    own_conn = conn is None
     try:
-        conn = sqlite3.connect('agencies.db')
-        cursor = conn.cursor()
+        if own_conn:
+            conn = connect_db()
 
-        # Take the highest confidence website as primary
-        best_website = discovered_websites[0]
-
-        # Prepare alternatives (all discovered websites)
-        alternatives = []
-        for i, website in enumerate(discovered_websites):
-            alternatives.append({
-                'url': website['url'],
-                'confidence': website.get('confidence', 0.5),
-                'reason': website.get('reason', 'AI discovered'),
-                'source': website.get('source', 'AI search'),
-                'priority': i + 1
-            })
-
-        # Update database
-        cursor.execute('''
-            UPDATE agencies
-            SET website = ?,
-                website_status = 'ai_discovered',
-                alternative_urls = ?,
-                url_validation_date = datetime('now'),
-                additional_info = additional_info || ?
-            WHERE id = ?
-        ''', (
-            best_website['url'],
-            json.dumps(alternatives),
-            f" | Website discovered via AI search on {time.strftime('%Y-%m-%d %H:%M:%S')}",
-            agency_id
-        ))
-
-        conn.commit()
-        conn.close()
+        conn.execute(DISCOVERY_UPDATE_SQL, discovery_update_params(agency_id, discovered_websites))
+
+        if own_conn:
+            conn.commit()
         return True
 
     except Exception as e:
         logging.error(f"Error updating agency with discovered website: {e}")
         return False
+    finally:
+        if own_conn and conn is not None:
+            conn.close()
 
 def main():
     """Main function to run AI-powered website discovery"""
     logging.info("Starting AI-powered website discovery...")
 
     discoverer = AIWebsiteDiscoverer()
+    conn = None
 
     try:
-        conn = sqlite3.connect('agencies.db')
+        # One connection serves the lookup and the batched updates
+        conn = connect_db()
+        ensure_lookup_indexes(conn)
         cursor = conn.cursor()
 
         # Get agencies with missing websites (including those without polish_city)
@@ -247,7 +304,6 @@ def main():
         ''')
 
         agencies = cursor.fetchall()
-        conn.close()
 
         if not agencies:
             print("✅ No agencies found with missing websites")
@@ -257,25 +313,35 @@ def main():
 
         discovered_count = 0
         processed_count = 0
+        pending = []
 
-        for agency_id, name, city in agencies[:10]:  # Limit to 10 for testing
+        def discover(agency):
+            agency_id, name, city = agency
             logging.info(f"Discovering website for: {name}")
-
-            discovered_websites = discoverer.discover_website_for_agency(name, city)
-
-            if discovered_websites:
-                if update_agency_with_discovered_website(agency_id, discovered_websites):
+            return agency, discoverer.discover_website_for_agency(name, city)
+
+        # Agencies are searched in parallel; results come back in order of
+        # appearance and the database is only written from this thread
+        with ThreadPoolExecutor(max_workers=DISCOVERY_CONCURRENCY) as executor:
+            for (agency_id, name, city), discovered_websites in executor.map(discover, agencies[:10]):  # Limit to 10 for testing
+                if discovered_websites:
+                    pending.append(discovery_update_params(agency_id, discovered_websites))
                     discovered_count += 1
                     logging.info(f"  ✅ Updated {name} with {len(discovered_websites)} discovered websites")
                 else:
-                    logging.error(f"  ❌ Failed to update database for {name}")
-            else:
-                logging.info(f"  ⚠️ No websites discovered for {name}")
+                    logging.info(f"  ⚠️ No websites discovered for {name}")
+
+                processed_count += 1
 
-            processed_count += 1
+                # Write every WRITE_BATCH_SIZE agencies to avoid losing progress
+                if len(pending) >= WRITE_BATCH_SIZE:
+                    with conn:
+                        cursor.executemany(DISCOVERY_UPDATE_SQL, pending)
+                    pending.clear()
 
-            # Rate limiting between agencies
-            time.sleep(3)
+        # Write the remaining results
+        with conn:
+            cursor.executemany(DISCOVERY_UPDATE_SQL, pending)
 
         logging.info(f"AI discovery complete: {discovered_count}/{processed_count} agencies updated with discovered websites")
 
@@ -287,6 +353,10 @@ def main():
     except Exception as e:
         logging.error(f"Error during AI website discovery: {e}")
         print(f"❌ Error: {e}")
+    finally:
+        if conn is not None:
+            conn.close()
+        discoverer.close()
 
 if __name__ == '__main__':
     main()
@@ -4,41 +4,177 @@ AI-Powered Website Recovery Tool
 Uses Gemini AI to find correct websites for agencies with broken or missing URLs
 """
 
-import sqlite3
+import re
 import json
 import time
 import os
+from collections import deque
 from datetime import datetime
 from google import genai
+from google.genai import types
 from dotenv import load_dotenv
 
+import _ai_cache
+from _db import connect_db, ensure_status_index
+
 load_dotenv()
 
+# Gemini quota for recovery searches: requests and tokens per rolling minute
+RECOVERY_REQUESTS_PER_MINUTE = 60
+RECOVERY_TOKENS_PER_MINUTE = 1000000
+RATE_WINDOW = 60  # seconds
+
+# Results are written every WRITE_BATCH_SIZE agencies to avoid losing progress
+WRITE_BATCH_SIZE = 10
+
+# One statement for every outcome: website is only replaced when not NULL
+RECOVERY_UPDATE_SQL = """
+    UPDATE agencies
+    SET website = COALESCE(?, website),
+        website_status = ?,
+        additional_info = COALESCE(additional_info, '') || ?
+    WHERE id = ?
+"""
+
+# First JSON object (one level of nesting) in a response that isn't pure JSON,
+# e.g. wrapped in markdown fences or surrounded by prose
+_JSON_OBJ = re.compile(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', re.DOTALL)
+
+# Stop calling Gemini after this many consecutive failures, for
+# BREAKER_RESET_AFTER seconds (or the server's Retry-After)
+BREAKER_FAIL_THRESHOLD = 5
+BREAKER_RESET_AFTER = 60
+
+def _parse_json_object(text):
+    """Parse a JSON object response, falling back to the first {...} block in the text"""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        match = _JSON_OBJ.search(text)
+        if not match:
+            raise
+        return json.loads(match.group(0))
+
+class CircuitBreaker:
+    """Opens after consecutive failures; once reset_after has passed one probe call is let through"""
+
+    def __init__(self, fail_threshold=BREAKER_FAIL_THRESHOLD, reset_after=BREAKER_RESET_AFTER):
+        self.fail_threshold = fail_threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.open_until = 0
+
+    def is_open(self):
+        """True while calls should be skipped; after the timeout (half-open) a probe is allowed"""
+        return self.failures >= self.fail_threshold and time.monotonic() < self.open_until
+
+    def record_success(self):
+        """Close the breaker"""
+        self.failures = 0
+        self.open_until = 0
+
+    def record_failure(self, retry_after=None):
+        """Count a failure, opening (or re-opening after a failed probe) at the threshold"""
+        self.failures += 1
+        if self.failures >= self.fail_threshold or retry_after:
+            self.failures = max(self.failures, self.fail_threshold)
+            self.open_until = time.monotonic() + (retry_after or self.reset_after)
+
+def _retry_after(error):
+    """Seconds from a Retry-After header on an API error's response, if any"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+# Structured output: Gemini returns exactly this JSON object, no markdown
+RECOVERY_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "website": {"type": "string", "nullable": True},
+        "confidence": {"type": "string", "enum": ["high", "medium", "low", "none"]},
+        "reasoning": {"type": "string"}
+    },
+    "required": ["website", "confidence", "reasoning"]
+}
+
 class WebsiteRecoveryAI:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, db_path='agencies.db'):
         self.api_key = api_key or os.getenv('GOOGLE_API_KEY')
         if not self.api_key:
             raise ValueError("GOOGLE_API_KEY environment variable not set")
 
         self.client = genai.Client(api_key=self.api_key)
         self.model = "gemini-2.5-flash"
-
-        # Rate limiting
-        self.last_request_time = 0
-        self.min_request_interval = 1.0  # seconds between requests
+        self.config = types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=RECOVERY_RESPONSE_SCHEMA
+        )
+
+        # Rate limiting: timestamps of requests and (timestamp, tokens) of
+        # responses within the last RATE_WINDOW seconds
+        self.rpm_limit = RECOVERY_REQUESTS_PER_MINUTE
+        self.tpm_limit = RECOVERY_TOKENS_PER_MINUTE
+        self.request_times = deque()
+        self.token_usage = deque()
+        self.window_tokens = 0
+
+        # Skip Gemini calls during outages or quota exhaustion
+        self.breaker = CircuitBreaker()
+
+        # Answers for unchanged agencies are reused from the ai_cache table
+        self.cache_conn = connect_db(db_path)
+        _ai_cache.ensure_table(self.cache_conn)
+
+    def close(self):
+        """Close the cache connection"""
+        self.cache_conn.close()
 
     def _rate_limit(self):
-        """Ensure we don't exceed API rate limits"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.min_request_interval:
-            time.sleep(self.min_request_interval - time_since_last)
-        self.last_request_time = time.time()
+        """Wait only while the last minute's requests or tokens are at the quota"""
+        while True:
+            now = time.monotonic()
+            cutoff = now - RATE_WINDOW
+            while self.request_times and self.request_times[0] <= cutoff:
+                self.request_times.popleft()
+            while self.token_usage and self.token_usage[0][0] <= cutoff:
+                self.window_tokens -= self.token_usage.popleft()[1]
+
+            if len(self.request_times) >= self.rpm_limit:
+                wait_until = self.request_times[0] + RATE_WINDOW
+            elif self.window_tokens >= self.tpm_limit:
+                wait_until = self.token_usage[0][0] + RATE_WINDOW
+            else:
+                self.request_times.append(now)
+                return
+            time.sleep(wait_until - now)
+
+    def _record_usage(self, response):
+        """Count the response's tokens towards the per-minute token quota"""
+        usage = getattr(response, 'usage_metadata', None)
+        tokens = getattr(usage, 'total_token_count', None) or 0
+        if tokens:
+            self.token_usage.append((time.monotonic(), tokens))
+            self.window_tokens += tokens
 
     def search_website_for_agency(self, agency_name, agency_address, current_website=None):
         """
         Use Gemini AI to find the correct website for an agency
         """
+        cache_key = _ai_cache.make_key('recovery', agency_name, agency_address, current_website)
+        cached = _ai_cache.get(self.cache_conn, cache_key)
+        if cached is not None:
+            return cached
+
+        if self.breaker.is_open():
+            return {
+                "website": None,
+                "confidence": "error",
+                "reasoning": "circuit open"
+            }
+
         self._rate_limit()
 
         prompt = f"""Find the correct website for this real estate agency:
@@ -70,26 +206,22 @@ Do not include explanations outside the JSON object."""
         try:
             response = self.client.models.generate_content(
                 model=self.model,
-                contents=prompt
+                contents=prompt,
+                config=self.config
             )
+            self._record_usage(response)
 
-            # Extract JSON from response
+            # The response is schema-constrained JSON; the extractor covers
+            # models that still wrap it in fences or prose
             response_text = response.text.strip()
 
-            # Clean up response (remove markdown code blocks if present)
-            if response_text.startswith('```json'):
-                response_text = response_text[7:]
-            if response_text.startswith('```'):
-                response_text = response_text[3:]
-            if response_text.endswith('```'):
-                response_text = response_text[:-3]
-
-            response_text = response_text.strip()
-
             try:
-                result = json.loads(response_text)
+                result = _parse_json_object(response_text)
+                self.breaker.record_success()
+                _ai_cache.put(self.cache_conn, cache_key, result)
                 return result
             except json.JSONDecodeError as e:
+                self.breaker.record_failure()
                 print(f"❌ JSON parsing error for {agency_name}: {e}")
                 print(f"Raw response: {response_text}")
                 return {
@@ -99,6 +231,7 @@ Do not include explanations outside the JSON object."""
                 }
 
         except Exception as e:
+            self.breaker.record_failure(_retry_after(e))
             print(f"❌ API error for {agency_name}: {e}")
             return {
                 "website": None,
@@ -117,7 +250,8 @@ def main():
         return
 
     # Connect to database
-    conn = sqlite3.connect('agencies.db')
+    conn = connect_db()
+    ensure_status_index(conn)
     cursor = conn.cursor()
 
     # Find agencies needing website recovery
@@ -134,6 +268,7 @@ def main():
     if not agencies_to_check:
         print("✅ No agencies need website recovery")
         conn.close()
+        recovery_ai.close()
         return
 
     print(f"📋 Found {len(agencies_to_check)} agencies needing website recovery")
@@ -141,8 +276,14 @@ def main():
     # Process agencies
     updated_count = 0
     error_count = 0
+    pending = []
+
+    for index, (agency_id, name, address, current_website, status) in enumerate(agencies_to_check):
+        # Don't mark the remaining agencies as not found while Gemini is failing
+        if recovery_ai.breaker.is_open():
+            print(f"\n⚠️  Gemini keeps failing, stopping early ({len(agencies_to_check) - index} agencies left)")
+            break
 
-    for agency_id, name, address, current_website, status in agencies_to_check:
         print(f"\n🔍 Processing: {name}")
 
         # Search for correct website
@@ -157,14 +298,7 @@ def main():
 
             # Update database
             update_note = f" | Website recovered via AI search on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} (confidence: {confidence}, reasoning: {result['reasoning']})"
-
-            cursor.execute("""
-                UPDATE agencies
-                SET website = ?,
-                    website_status = 'recovered',
-                    additional_info = COALESCE(additional_info, '') || ?
-                WHERE id = ?
-            """, (new_website, update_note, agency_id))
+            pending.append((new_website, 'recovered', update_note, agency_id))
 
             updated_count += 1
 
@@ -172,34 +306,28 @@ def main():
             print(f"   ⚠️  Low confidence result: {result['website']} - skipping")
 
             # Mark as low_confidence
-            cursor.execute("""
-                UPDATE agencies
-                SET website_status = 'low_confidence',
-                    additional_info = COALESCE(additional_info, '') || ?
-                WHERE id = ?
-            """, (f" | Low confidence website suggestion: {result['website']} on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", agency_id))
+            pending.append((None, 'low_confidence', f" | Low confidence website suggestion: {result['website']} on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", agency_id))
 
         else:
             print(f"   ❌ No website found: {result['reasoning']}")
 
             # Mark as no_website_found
-            cursor.execute("""
-                UPDATE agencies
-                SET website_status = 'no_website_found',
-                    additional_info = COALESCE(additional_info, '') || ?
-                WHERE id = ?
-            """, (f" | No website found via AI search on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ({result['reasoning']})", agency_id))
+            pending.append((None, 'no_website_found', f" | No website found via AI search on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ({result['reasoning']})", agency_id))
 
             error_count += 1
 
-        # Commit every 10 agencies to avoid losing progress
-        if (updated_count + error_count) % 10 == 0:
-            conn.commit()
+        # Write every WRITE_BATCH_SIZE agencies to avoid losing progress
+        if len(pending) >= WRITE_BATCH_SIZE:
+            with conn:
+                cursor.executemany(RECOVERY_UPDATE_SQL, pending)
+            pending.clear()
             print(f"   💾 Progress saved: {updated_count + error_count}/{len(agencies_to_check)} processed")
 
-    # Final commit
-    conn.commit()
+    # Final write
+    with conn:
+        cursor.executemany(RECOVERY_UPDATE_SQL, pending)
     conn.close()
+    recovery_ai.close()
 
     print("\n🎉 Website recovery complete!")
     print(f"   Websites recovered: {updated_count}")